@@ -4,28 +4,64 @@ Base Analyzer - 基础分析器抽象类
 定义了所有分析器的通用接口和共同功能
 """
 
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
 from ..modules.data_provider import DataProvider
 from ..modules.statistics_calculator import StatisticsCalculator
 from ..modules.file_manager import FileManager
-from ..visualizers.returns_visualizer import ReturnsVisualizer
+
+# ticker别名映射（键为大写形式）
+_TICKER_ALIASES = {'SPX': '^GSPC'}
+
+# 百分位行的格式化函数（按标签预先绑定str.format，避免每行重新解析f-string）
+_PCT_FORMATTERS = {
+    '%': "   {p:2d}%: {v:6.3f}%".format,
+    '% percentile': "   {p:2d}% percentile: {v:6.3f}%".format,
+}
+
+
+@lru_cache(maxsize=1)
+def _default_visualizer():
+    """进程内共享的可视化器（首次画图时才导入matplotlib并创建）"""
+    from ..visualizers.returns_visualizer import ReturnsVisualizer
+    return ReturnsVisualizer()
 
 
 class BaseAnalyzer(ABC):
     """基础分析器抽象类 - 定义所有分析器的通用接口"""
     
-    def __init__(self, db_path: str = "ticker_data/stock_cache.db"):
+    # 分析类型名称，由子类在类体中设置
+    _ANALYSIS_NAME = ""
+    
+    def __init__(self, db_path: str = "ticker_data/stock_cache.db",
+                 data_provider: Optional[DataProvider] = None,
+                 stats_calculator: Optional[StatisticsCalculator] = None,
+                 file_manager: Optional[FileManager] = None,
+                 visualizer=None):
         """
         初始化基础分析器
         
         Args:
             db_path: SQLite数据库路径
+            data_provider: 共享的数据提供器（不提供则新建）
+            stats_calculator: 共享的统计计算器（不提供则新建）
+            file_manager: 共享的文件管理器（不提供则新建）
+            visualizer: 可视化器（不提供则在首次画图时使用进程内共享的实例）
         """
-        self.data_provider = DataProvider(db_path)
-        self.stats_calculator = StatisticsCalculator()
-        self.file_manager = FileManager()
-        self.visualizer = ReturnsVisualizer()
+        self.data_provider = data_provider or DataProvider(db_path)
+        self.stats_calculator = stats_calculator or StatisticsCalculator()
+        self.file_manager = file_manager or FileManager()
+        self._visualizer = visualizer
+    
+    @property
+    def visualizer(self):
+        """懒加载可视化器（仅在需要画图时才导入matplotlib）"""
+        if self._visualizer is None:
+            self._visualizer = _default_visualizer()
+        return self._visualizer
     
     @abstractmethod
     def analyze(self, ticker: str, create_plots: bool = True, **kwargs) -> Dict:
@@ -42,21 +78,42 @@ class BaseAnalyzer(ABC):
         """
         pass
     
-    @abstractmethod
     def get_analysis_name(self) -> str:
         """返回分析类型名称"""
-        pass
+        return self._ANALYSIS_NAME
     
-    def _convert_ticker(self, ticker: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _convert_ticker(ticker: str) -> str:
         """统一的ticker格式转换"""
-        if ticker.upper() == 'SPX':
-            return '^GSPC'
-        return ticker
+        return _TICKER_ALIASES.get(ticker.upper(), ticker)
     
     def _print_analysis_header(self, ticker: str, analysis_name: str):
         """打印分析标题"""
         print(f"\n=== 分析 {ticker} {analysis_name} ===")
     
+    def _emit(self, lines: List[str]):
+        """将缓冲的多行输出一次性写到标准输出"""
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    def _format_percentiles(self, title: str, pct_dict: Dict[int, float],
+                            label: str = '%') -> str:
+        """
+        将百分位数字典格式化为一段文本（标题 + 每个百分位一行）
+        
+        Args:
+            title: 段落标题
+            pct_dict: {百分位: 数值} 字典
+            label: 百分位数字后的标签，'%' 或 '% percentile'
+            
+        Returns:
+            格式化后的多行文本
+        """
+        ps = np.fromiter(pct_dict.keys(), dtype=np.int32, count=len(pct_dict))
+        vs = np.fromiter(pct_dict.values(), dtype=np.float64, count=len(pct_dict))
+        fmt = _PCT_FORMATTERS[label]
+        return "\n".join([title, *(fmt(p=p, v=v) for p, v in zip(ps.tolist(), vs.tolist()))])
+    
     def _save_results(self, stats: Dict, ticker: str, suffix: str):
         """保存分析结果"""
         filename = f'{ticker}_{suffix}'
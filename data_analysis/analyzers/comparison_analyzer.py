@@ -4,7 +4,9 @@ Comparison Analyzer - 对比分析器
 专门负责比较多个股票的收益率特征
 """
 
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from .base_analyzer import BaseAnalyzer
 
@@ -12,9 +14,10 @@ from .base_analyzer import BaseAnalyzer
 class ComparisonAnalyzer(BaseAnalyzer):
     """对比分析器 - 比较多个股票的收益率特征"""
     
-    def get_analysis_name(self) -> str:
-        """返回分析类型名称"""
-        return "多股票收益率对比分析"
+    _ANALYSIS_NAME = "多股票收益率对比分析"
+    
+    # 计算相关性所需的最少共同交易日数
+    MIN_CORRELATION_DAYS = 30
     
     def analyze(self, tickers: List[str], create_plots: bool = True, **kwargs) -> Dict:
         """
@@ -33,19 +36,20 @@ class ComparisonAnalyzer(BaseAnalyzer):
         
         returns_data = {}
         comparison_stats = {}
+        converted_tickers = [self._convert_ticker(t) for t in tickers]
         
-        # 获取所有股票的收益率数据
-        for ticker in tickers:
-            original_ticker = ticker
-            ticker = self._convert_ticker(ticker)
-            
-            data = self.data_provider.get_stock_data_from_db(ticker, '1d')
-            if data is not None:
-                returns = self.stats_calculator.calculate_returns(data, 'Close')
+        # 一次批量查询取回所有股票的数据
+        frames = dict(self.data_provider.get_stock_data_bulk(converted_tickers, '1d'))
+        
+        # 并行计算各股票的收益率及统计（各ticker相互独立），结果按输入顺序在主线程合并
+        with ThreadPoolExecutor(max_workers=min(8, len(tickers)) or 1) as executor:
+            results = list(executor.map(self._analyze_one, tickers, converted_tickers,
+                                        [frames.get(t) for t in converted_tickers]))
+        
+        for original_ticker, result in zip(tickers, results):
+            if result is not None:
+                returns, stats = result
                 returns_data[original_ticker] = returns
-                stats = self.stats_calculator.calculate_basic_stats(returns)
-                stats['ticker'] = ticker
-                stats['original_ticker'] = original_ticker
                 comparison_stats[original_ticker] = stats
                 print(f"   ✅ 获取 {original_ticker} 数据: {len(returns)} 条记录")
             else:
@@ -55,14 +59,31 @@ class ComparisonAnalyzer(BaseAnalyzer):
             print("❌ 没有找到任何股票数据")
             return {}
         
+        # 按日期对齐为一个(T, K)收益率矩阵，只构建一次，相关性计算和热图共用
+        self._returns_matrix = pd.concat(returns_data, axis=1)
+        
+        # 计算相关性矩阵（共同交易日太少时结果无意义，直接跳过）
+        corr_df = None
+        if len(returns_data) > 1:
+            common_days = int(self._returns_matrix.notna().all(axis=1).sum())
+            if common_days >= self.MIN_CORRELATION_DAYS:
+                corr_df = self.stats_calculator.calculate_correlation_matrix(self._returns_matrix)
+            else:
+                print(f"   ⚠️ 共同交易日仅{common_days}天（少于{self.MIN_CORRELATION_DAYS}天），跳过相关性计算")
+                comparison_stats['correlation_matrix'] = None
+        
         # 创建对比图表
         if create_plots and len(returns_data) > 1:
-            filename = self.visualizer.create_comparison_plot(returns_data)
+            plot_corr = corr_df
+            if plot_corr is None:
+                # 热图显示为空白，避免可视化器再次计算相关性
+                plot_corr = pd.DataFrame(np.nan, index=self._returns_matrix.columns,
+                                         columns=self._returns_matrix.columns)
+            filename = self.visualizer.create_comparison_plot(returns_data, corr_df=plot_corr,
+                                                              stats_data=comparison_stats)
             comparison_stats['comparison_chart'] = filename
         
-        # 计算相关性矩阵
-        if len(returns_data) > 1:
-            corr_df = self.stats_calculator.calculate_correlation_matrix(returns_data)
+        if corr_df is not None:
             comparison_stats['correlation_matrix'] = corr_df.to_dict()
         
         # 添加对比分析元信息
@@ -74,67 +95,66 @@ class ComparisonAnalyzer(BaseAnalyzer):
         }
         
         # 打印对比结果
-        self._print_comparison_results(comparison_stats, list(returns_data.keys()))
+        self._print_comparison_results(comparison_stats, list(returns_data.keys()), corr_df)
         
         # 保存结果
-        filename_suffix = '_'.join([self._convert_ticker(t) for t in original_tickers])
+        filename_suffix = '_'.join(converted_tickers)
         self._save_results(comparison_stats, filename_suffix, 'comparison_analysis')
         
         return comparison_stats
     
-    def _print_comparison_results(self, comparison_stats: Dict, tickers: List[str]):
-        """打印对比分析结果"""
-        print(f"\n📊 收益率对比分析结果：")
-        
-        # 创建对比表格
-        comparison_df = pd.DataFrame({
-            ticker: {
-                'Mean': stats['mean'],
-                'Std': stats['std'],
-                'Min': stats['min'],
-                'Max': stats['max'],
-                'Skewness': stats['skewness'],
-                'Kurtosis': stats['kurtosis']
-            }
-            for ticker, stats in comparison_stats.items()
-            if ticker in tickers  # 排除非ticker的键
-        }).T
-        
-        print(comparison_df.round(4))
+    def _analyze_one(self, original_ticker: str, ticker: str,
+                     data: Optional[pd.DataFrame]) -> Optional[Tuple[pd.Series, Dict]]:
+        """计算单个股票（已转换的ticker）的收益率及基础统计，无数据时返回None"""
+        if data is None:
+            return None
+        
+        returns = self.stats_calculator.calculate_returns(data, 'Close')
+        stats = self.stats_calculator.calculate_basic_stats(returns)
+        stats['ticker'] = ticker
+        stats['original_ticker'] = original_ticker
+        return returns, stats
+    
+    def _print_comparison_results(self, comparison_stats: Dict, tickers: List[str],
+                                  corr_df: Optional[pd.DataFrame] = None):
+        """打印对比分析结果（相关性矩阵直接使用已计算的DataFrame，不从字典重建）"""
+        lines = []
+        
+        lines.append(f"\n📊 收益率对比分析结果：")
+        
+        # 创建对比表格：直接按(ticker, 指标)填充数组，避免dict-of-dict构造再转置
+        stat_keys = ['mean', 'std', 'min', 'max', 'skewness', 'kurtosis']
+        names = [ticker for ticker in tickers if ticker in comparison_stats]  # 排除非ticker的键
+        table = np.array([[comparison_stats[ticker][key] for key in stat_keys] for ticker in names],
+                         dtype=np.float64).reshape(len(names), len(stat_keys))
+        comparison_df = pd.DataFrame(table, index=names,
+                                     columns=['Mean', 'Std', 'Min', 'Max', 'Skewness', 'Kurtosis'])
+        
+        lines.append(str(comparison_df.round(4)))
         
         # 打印相关性信息
-        if 'correlation_matrix' in comparison_stats:
-            print(f"\n📈 收益率相关性矩阵：")
-            corr_df = pd.DataFrame(comparison_stats['correlation_matrix'])
-            print(corr_df.round(4))
+        if corr_df is not None:
+            lines.append(f"\n📈 收益率相关性矩阵：")
+            lines.append(str(corr_df.round(4)))
         
         # 打印风险收益比较
-        print(f"\n🎯 风险收益特征排名：")
-        risk_return_data = []
-        for ticker in tickers:
-            if ticker in comparison_stats:
-                stats = comparison_stats[ticker]
-                risk_return_data.append({
-                    'Ticker': ticker,
-                    'Return': stats['mean'],
-                    'Risk': stats['std'],
-                    'Sharpe': stats['mean'] / stats['std'] if stats['std'] > 0 else 0
-                })
-        
-        if risk_return_data:
-            risk_return_df = pd.DataFrame(risk_return_data)
+        lines.append(f"\n🎯 风险收益特征排名：")
+        if names:
+            # 收益率和风险直接取对比表格的前两列
+            mean_returns = table[:, 0]
+            risks = table[:, 1]
+            sharpes = np.divide(mean_returns, risks, out=np.zeros_like(mean_returns), where=risks > 0)
             
-            print("   按收益率排序:")
-            sorted_by_return = risk_return_df.sort_values('Return', ascending=False)
-            for i, row in sorted_by_return.iterrows():
-                print(f"     {row['Ticker']}: {row['Return']:.3f}%")
+            lines.append("   按收益率排序:")
+            for i in np.argsort(-mean_returns, kind='stable'):
+                lines.append(f"     {names[i]}: {mean_returns[i]:.3f}%")
             
-            print("   按风险排序（标准差）:")
-            sorted_by_risk = risk_return_df.sort_values('Risk', ascending=True)
-            for i, row in sorted_by_risk.iterrows():
-                print(f"     {row['Ticker']}: {row['Risk']:.3f}%")
+            lines.append("   按风险排序（标准差）:")
+            for i in np.argsort(risks, kind='stable'):
+                lines.append(f"     {names[i]}: {risks[i]:.3f}%")
             
-            print("   按夏普比率排序:")
-            sorted_by_sharpe = risk_return_df.sort_values('Sharpe', ascending=False)
-            for i, row in sorted_by_sharpe.iterrows():
-                print(f"     {row['Ticker']}: {row['Sharpe']:.3f}")
+            lines.append("   按夏普比率排序:")
+            for i in np.argsort(-sharpes, kind='stable'):
+                lines.append(f"     {names[i]}: {sharpes[i]:.3f}")
+        
+        self._emit(lines)
@@ -4,27 +4,40 @@ Returns Analyzer Factory - 收益率分析器工厂
 使用工厂模式统一管理各种分析器，提供简洁的接口
 """
 
-from typing import Dict, List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .base_analyzer import BaseAnalyzer
 from .daily_returns_analyzer import DailyReturnsAnalyzer
 from .intraday_returns_analyzer import IntradayReturnsAnalyzer
 from .weekly_returns_analyzer import WeeklyReturnsAnalyzer
 from .comparison_analyzer import ComparisonAnalyzer
 from .daily_range_analyzer import DailyRangeAnalyzer
 from ..modules.data_provider import DataProvider
+from ..modules.statistics_calculator import StatisticsCalculator
+from ..modules.file_manager import FileManager
 
 
 class ReturnsAnalyzer:
     """收益率分析器工厂 - 统一管理各种分析器"""
     
-    def __init__(self, db_path: str = "ticker_data/stock_cache.db"):
+    def __init__(self, db_path: str = "ticker_data/stock_cache.db", use_analysis_cache: bool = False):
         """
         初始化分析器工厂
         
         Args:
             db_path: SQLite数据库路径
+            use_analysis_cache: 是否把分析结果缓存到数据库旁的cache目录（数据未更新时直接读取，
+                                命中缓存时不会重新打印统计和生成图表）
         """
         self.db_path = db_path
+        # 所有分析器共享同一个数据提供器，同一ticker的数据只从数据库读取一次
         self.data_provider = DataProvider(db_path)
+        # 统计计算器和文件管理器同样只创建一份，注入到各分析器
+        self.stats_calculator = StatisticsCalculator()
+        self.file_manager = FileManager()
+        self.use_analysis_cache = use_analysis_cache
+        self.analysis_cache_dir = os.path.join(os.path.dirname(db_path), 'cache')
         
         # 初始化各种分析器
         self._daily_analyzer = None
@@ -33,41 +46,63 @@ class ReturnsAnalyzer:
         self._comparison_analyzer = None
         self._daily_range_analyzer = None
     
+    def _shared_components(self) -> Dict:
+        """各分析器共用的依赖（可视化器由分析器在首次画图时取进程内共享实例）"""
+        return {
+            'db_path': self.db_path,
+            'data_provider': self.data_provider,
+            'stats_calculator': self.stats_calculator,
+            'file_manager': self.file_manager,
+        }
+    
     @property
     def daily_analyzer(self) -> DailyReturnsAnalyzer:
         """懒加载每日收益率分析器"""
         if self._daily_analyzer is None:
-            self._daily_analyzer = DailyReturnsAnalyzer(self.db_path)
+            self._daily_analyzer = DailyReturnsAnalyzer(**self._shared_components())
         return self._daily_analyzer
     
     @property
     def intraday_analyzer(self) -> IntradayReturnsAnalyzer:
         """懒加载日内收益率分析器"""
         if self._intraday_analyzer is None:
-            self._intraday_analyzer = IntradayReturnsAnalyzer(self.db_path)
+            self._intraday_analyzer = IntradayReturnsAnalyzer(**self._shared_components())
         return self._intraday_analyzer
     
     @property
     def weekly_analyzer(self) -> WeeklyReturnsAnalyzer:
         """懒加载周收益率分析器"""
         if self._weekly_analyzer is None:
-            self._weekly_analyzer = WeeklyReturnsAnalyzer(self.db_path)
+            self._weekly_analyzer = WeeklyReturnsAnalyzer(**self._shared_components())
         return self._weekly_analyzer
     
     @property
     def comparison_analyzer(self) -> ComparisonAnalyzer:
         """懒加载对比分析器"""
         if self._comparison_analyzer is None:
-            self._comparison_analyzer = ComparisonAnalyzer(self.db_path)
+            self._comparison_analyzer = ComparisonAnalyzer(**self._shared_components())
         return self._comparison_analyzer
     
     @property
     def daily_range_analyzer(self) -> DailyRangeAnalyzer:
         """懒加载日内波动范围分析器"""
         if self._daily_range_analyzer is None:
-            self._daily_range_analyzer = DailyRangeAnalyzer(self.db_path)
+            self._daily_range_analyzer = DailyRangeAnalyzer(**self._shared_components())
         return self._daily_range_analyzer
     
+    def _cached(self, kind: str, ticker: str, interval: str, create_plots: bool,
+                compute_fn: Callable[[], Dict]) -> Dict:
+        """启用分析缓存时，以 (分析类型, ticker, 间隔, 是否画图, 最新数据时间戳) 为键复用结果"""
+        if not self.use_analysis_cache:
+            return compute_fn()
+        
+        last_ts = self.data_provider.get_last_timestamp(BaseAnalyzer._convert_ticker(ticker), interval)
+        if last_ts is None:
+            return compute_fn()
+        
+        key = (kind, ticker, interval, create_plots, last_ts)
+        return self.file_manager.cached_analysis(key, compute_fn, self.analysis_cache_dir)
+    
     # 保持向后兼容的方法
     def analyze_daily_returns(self, ticker: str, create_plots: bool = True) -> Dict:
         """
@@ -80,7 +115,8 @@ class ReturnsAnalyzer:
         Returns:
             分析结果字典
         """
-        return self.daily_analyzer.analyze(ticker, create_plots)
+        return self._cached('daily', ticker, '1d', create_plots,
+                            lambda: self.daily_analyzer.analyze(ticker, create_plots))
     
     def analyze_intraday_returns(self, ticker: str, create_plots: bool = True) -> Dict:
         """
@@ -93,7 +129,8 @@ class ReturnsAnalyzer:
         Returns:
             分析结果字典
         """
-        return self.intraday_analyzer.analyze(ticker, create_plots)
+        return self._cached('intraday', ticker, '1d', create_plots,
+                            lambda: self.intraday_analyzer.analyze(ticker, create_plots))
     
     def analyze_weekly_returns(self, ticker: str, create_plots: bool = True) -> Dict:
         """
@@ -106,7 +143,8 @@ class ReturnsAnalyzer:
         Returns:
             分析结果字典
         """
-        return self.weekly_analyzer.analyze(ticker, create_plots)
+        return self._cached('weekly', ticker, '1wk', create_plots,
+                            lambda: self.weekly_analyzer.analyze(ticker, create_plots))
     
     def compare_returns(self, tickers: List[str], create_plots: bool = True) -> Dict:
         """
@@ -132,7 +170,36 @@ class ReturnsAnalyzer:
         Returns:
             分析结果字典
         """
-        return self.daily_range_analyzer.analyze(ticker, create_plots)
+        return self._cached('daily_range', ticker, '1d', create_plots,
+                            lambda: self.daily_range_analyzer.analyze(ticker, create_plots))
+    
+    def run_all(self, ticker: str, create_plots: bool = True) -> Dict[str, Dict]:
+        """
+        对同一股票运行每日、日内和周收益率分析
+        
+        先并行预取日线和周线数据到共享的数据提供器缓存；不画图时三个分析并行执行，
+        画图时按顺序执行（matplotlib只能在主线程安全绘图）
+        
+        Args:
+            ticker: 股票代码
+            create_plots: 是否创建可视化图表
+            
+        Returns:
+            {'daily': ..., 'intraday': ..., 'weekly': ...} 分析结果字典
+        """
+        kinds = ('daily', 'intraday', 'weekly')
+        converted = BaseAnalyzer._convert_ticker(ticker)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda interval: self.data_provider.get_stock_data_from_db(converted, interval),
+                              ('1d', '1wk')))
+            
+            if not create_plots:
+                futures = {kind: executor.submit(getattr(self, f'analyze_{kind}_returns'), ticker, False)
+                           for kind in kinds}
+                return {kind: future.result() for kind, future in futures.items()}
+        
+        return {kind: getattr(self, f'analyze_{kind}_returns')(ticker, create_plots) for kind in kinds}
     
     def get_available_data(self) -> List[Dict]:
         """获取数据库中可用的数据列表"""
@@ -8,7 +8,12 @@ import sqlite3
 import pandas as pd
 import numpy as np
 import os
-from typing import Optional, Dict, List
+import threading
+from collections import OrderedDict
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional, Dict, Iterator, List, Tuple
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -17,84 +22,278 @@ warnings.filterwarnings('ignore')
 class DataProvider:
     """数据提供器类 - 负责数据库操作和基础数据处理"""
     
-    def __init__(self, db_path: str = "ticker_data/stock_cache.db"):
+    PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+    
+    # DataFrame列名到数据库字段的映射（顺序即默认的列顺序）
+    COLUMN_FIELDS = {
+        'Open': 'open_price',
+        'High': 'high_price',
+        'Low': 'low_price',
+        'Close': 'close_price',
+        'Volume': 'volume',
+    }
+    
+    def __init__(self, db_path: str = "ticker_data/stock_cache.db", cache_size: int = 128,
+                 price_dtype: type = np.float64):
         """
         初始化数据提供器
         
         Args:
             db_path: SQLite数据库路径
+            cache_size: 最多缓存的 (ticker, interval) 数据集个数（LRU淘汰）
+            price_dtype: OHLC价格列的存储类型，传入np.float32可使缓存数据占用减半
+                         （统计计算仍在float64下进行）
         """
         self.db_path = db_path
+        self.price_dtype = np.dtype(price_dtype)
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Database not found: {db_path}")
+        
+        # 整个实例复用一个只读连接，避免每次查询都重新打开数据库文件；
+        # 共享此实例的分析器可能在多个线程中查询，用锁串行化对连接的访问
+        self._conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA query_only=ON")
+        self._conn_lock = threading.Lock()
+        
+        # 已加载数据的LRU缓存，按 (ticker, interval[, 列]) 索引，供共享此实例的分析器复用
+        self._cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._data_version = self._read_data_version()
     
-    def get_stock_data_from_db(self, ticker: str, interval: str = '1d') -> Optional[pd.DataFrame]:
+    def get_stock_data_from_db(self, ticker: str, interval: str = '1d',
+                               columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
         """
         从数据库读取股票数据
         
         Args:
             ticker: 股票代码
             interval: 数据间隔 (1d, 1wk, 1mo)
+            columns: 只读取的列（如 ['Close']），不提供则读取全部OHLCV列
             
         Returns:
             DataFrame containing stock data or None if not found
         """
+        key = (ticker, interval)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached if columns is None else cached[columns]
+        
+        names = list(self.COLUMN_FIELDS)
+        if columns is not None:
+            # 只取部分列时单独缓存，已有完整数据时直接从中取列
+            names = list(columns)
+            key = (ticker, interval, tuple(names))
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            # 查询数据库中的数据
-            query = """
-            SELECT date, open_price as "Open", high_price as "High", 
-                   low_price as "Low", close_price as "Close", volume as "Volume"
+            # 查询数据库中的数据（只选取需要的列）
+            fields = ", ".join(f'{self.COLUMN_FIELDS[name]} as "{name}"' for name in names)
+            query = f"""
+            SELECT date, {fields}
             FROM stock_data 
             WHERE ticker = ? AND interval = ?
             ORDER BY date ASC
             """
             
-            df = pd.read_sql_query(query, conn, params=(ticker, interval))
-            conn.close()
+            rows = self._fetch_rows(query, (ticker, interval))
             
-            if df.empty:
+            if not rows:
                 print(f"No data found for {ticker} with interval {interval}")
                 return None
             
-            # 设置日期为索引
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-            
-            # 确保数值列为float类型
-            numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            return self._store_cached(key, self._build_frame(zip(*rows), ticker, names))
             
-            print(f"✓ Loaded {len(df)} rows of {ticker} data from database")
-            print(f"  Date range: {df.index.min().date()} to {df.index.max().date()}")
+        except Exception as e:
+            print(f"Error reading data from database: {e}")
+            return None
+    
+    def get_stock_data_bulk(self, tickers: List[str], interval: str = '1d') -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        用一条 IN (...) 查询批量读取多个股票的数据
+        
+        已缓存的ticker直接取缓存，其余ticker合并为一次查询后按ticker拆分
+        
+        Args:
+            tickers: 股票代码列表
+            interval: 数据间隔 (1d, 1wk, 1mo)
             
-            return df
+        Yields:
+            按输入顺序产出 (ticker, DataFrame)，无数据的ticker会被跳过
+        """
+        frames: Dict[str, pd.DataFrame] = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            cached = self._get_cached((ticker, interval))
+            if cached is not None:
+                frames[ticker] = cached
+            else:
+                missing.append(ticker)
+        
+        if missing:
+            try:
+                placeholders = ','.join('?' * len(missing))
+                query = f"""
+                SELECT ticker, date, open_price as "Open", high_price as "High", 
+                       low_price as "Low", close_price as "Close", volume as "Volume"
+                FROM stock_data 
+                WHERE ticker IN ({placeholders}) AND interval = ?
+                ORDER BY ticker, date ASC
+                """
+                
+                rows = self._fetch_rows(query, [*missing, interval])
+                
+                # 结果已按ticker排序，逐段转成列后构建DataFrame
+                for ticker, group in groupby(rows, key=itemgetter(0)):
+                    _, *columns = zip(*group)
+                    frame = self._build_frame(columns, ticker)
+                    frames[ticker] = self._store_cached((ticker, interval), frame)
+                
+            except Exception as e:
+                print(f"Error reading data from database: {e}")
+        
+        for ticker in missing:
+            if ticker not in frames:
+                print(f"No data found for {ticker} with interval {interval}")
+        
+        for ticker in tickers:
+            if ticker in frames:
+                yield ticker, frames[ticker]
+    
+    def get_last_timestamp(self, ticker: str, interval: str = '1d') -> Optional[Tuple[str, int]]:
+        """
+        获取某个数据集的最新数据日期和最近写入时间，用作分析结果缓存的失效标记
+        
+        Args:
+            ticker: 股票代码
+            interval: 数据间隔 (1d, 1wk, 1mo)
             
+        Returns:
+            (最新日期, 最近cached_at)，无数据时返回None
+        """
+        try:
+            with self._conn_lock:
+                row = self._conn.execute(
+                    "SELECT MAX(date), MAX(cached_at) FROM stock_data WHERE ticker = ? AND interval = ?",
+                    (ticker, interval)).fetchone()
         except Exception as e:
             print(f"Error reading data from database: {e}")
             return None
+        
+        if row is None or row[0] is None:
+            return None
+        return row[0], row[1]
+    
+    def _read_sql(self, query: str, params) -> pd.DataFrame:
+        """在共享的只读连接上执行查询"""
+        with self._conn_lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+    
+    def _fetch_rows(self, query: str, params) -> List[tuple]:
+        """在共享的只读连接上执行查询，直接返回原始行（不经过pandas的类型推断）"""
+        with self._conn_lock:
+            return self._conn.execute(query, params).fetchall()
+    
+    def close(self):
+        """关闭数据库连接"""
+        conn = getattr(self, '_conn', None)
+        if conn is not None:
+            conn.close()
+            self._conn = None
+    
+    def __del__(self):
+        self.close()
+    
+    def _build_frame(self, columns, ticker: str, names: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        将按列拆开的查询结果构建为以日期为索引的DataFrame
+        
+        Args:
+            columns: 日期列加上各数据列的值序列
+            ticker: 股票代码（仅用于打印）
+            names: 数据列名，默认为全部OHLCV列
+        """
+        dates, *values = columns
+        
+        data = {}
+        for name, column in zip(names or self.COLUMN_FIELDS, values):
+            # NULL转为NaN
+            array = np.array(column, dtype=np.float64)
+            if name == 'Volume':
+                # 成交量无缺失时保持整数类型
+                data[name] = array if np.isnan(array).any() else array.astype(np.int64)
+            else:
+                data[name] = array.astype(self.price_dtype, copy=False)
+        
+        df = pd.DataFrame(data, index=self._parse_dates(dates))
+        
+        print(f"✓ Loaded {len(df)} rows of {ticker} data from database")
+        print(f"  Date range: {df.index.min().date()} to {df.index.max().date()}")
+        
+        return df
+    
+    def _read_data_version(self) -> Optional[int]:
+        """读取SQLite的data_version（其他连接提交写入后该值会变化）"""
+        try:
+            with self._conn_lock:
+                return self._conn.execute("PRAGMA data_version").fetchone()[0]
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _parse_dates(dates) -> pd.DatetimeIndex:
+        """将数据库中的ISO日期字符串（YYYY-MM-DD）解析为日期索引"""
+        try:
+            # NumPy直接在C层解析ISO日期，比pandas逐个推断格式快得多
+            parsed = np.array(dates, dtype='datetime64[D]').astype('datetime64[us]')
+        except ValueError:
+            return pd.DatetimeIndex(pd.to_datetime(list(dates)), name='date')
+        return pd.DatetimeIndex(parsed, name='date')
+    
+    def _get_cached(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """从LRU缓存取数据，命中时返回浅拷贝（调用方增删列不会影响缓存中的数据）"""
+        # 数据库被其他连接（如数据获取模块）写入过时，整个缓存失效
+        version = self._read_data_version()
+        with self._cache_lock:
+            if version != self._data_version:
+                self._cache.clear()
+                self._data_version = version
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            self._cache.move_to_end(key)
+        return cached.copy(deep=False)
+    
+    def _store_cached(self, key: Tuple, df: pd.DataFrame) -> pd.DataFrame:
+        """写入LRU缓存（超出容量时淘汰最久未使用的数据），返回浅拷贝"""
+        with self._cache_lock:
+            self._cache[key] = df
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return df.copy(deep=False)
     
     def get_available_data(self) -> List[Dict]:
         """获取数据库中可用的数据列表"""
         try:
-            conn = sqlite3.connect(self.db_path)
             query = """
             SELECT ticker, interval, 
                    MIN(date) as start_date, 
                    MAX(date) as end_date,
                    COUNT(*) as record_count,
-                   MIN(cached_at) as first_cached,
-                   MAX(cached_at) as last_cached
+                   DATETIME(MIN(cached_at), 'unixepoch', 'localtime') as first_cached,
+                   DATETIME(MAX(cached_at), 'unixepoch', 'localtime') as last_cached
             FROM stock_data 
             GROUP BY ticker, interval
             ORDER BY ticker, interval
             """
             
-            result = pd.read_sql_query(query, conn)
-            conn.close()
+            result = self._read_sql(query, None)
             
             if result.empty:
                 print("No data found in database")
@@ -4,10 +4,50 @@ File Manager - 文件管理器
 负责分析结果的保存和文件管理
 """
 
+import hashlib
 import json
+import math
 import os
-from datetime import datetime
-from typing import Dict, Any
+import pickle
+from datetime import date, datetime
+from typing import Dict, Any, Callable, Hashable
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库json
+    orjson = None
+
+# 分析结果缓存的版本号，分析逻辑或结果结构变化时递增以使旧缓存失效
+ANALYSIS_CACHE_VERSION = 1
+
+# 图表文件名中的日期字符串，按天缓存
+_DATE_CACHE = {'day': None, 'str': None}
+
+
+def _today_str() -> str:
+    """返回当天的YYYYMMDD字符串（日期变化时才重新格式化）"""
+    today = date.today()
+    if _DATE_CACHE['day'] != today:
+        _DATE_CACHE['str'] = today.strftime("%Y%m%d")
+        _DATE_CACHE['day'] = today
+    return _DATE_CACHE['str']
+
+
+def _to_builtin(obj):
+    """把numpy标量/数组转换为Python数值/列表，NaN/Inf转换为None（与orjson的输出一致）"""
+    if isinstance(obj, dict):
+        return {key: _to_builtin(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(item) for item in obj]
+    if isinstance(obj, np.ndarray):
+        return _to_builtin(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
 
 
 class FileManager:
@@ -43,14 +83,61 @@ class FileManager:
         full_filename = f"results/{base_filename}_{timestamp}.json"
         
         try:
-            with open(full_filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+            # 两种写法输出一致：numpy数值写为JSON数字，NaN/Inf写为null，日期时间按str()写出
+            if orjson is not None:
+                # orjson原生支持numpy标量/数组和非字符串键，无需逐值回调
+                payload = orjson.dumps(results, default=str, option=orjson.OPT_INDENT_2
+                                       | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                                       | orjson.OPT_PASSTHROUGH_DATETIME)
+                with open(full_filename, 'wb') as f:
+                    f.write(payload)
+            else:
+                with open(full_filename, 'w', encoding='utf-8') as f:
+                    json.dump(_to_builtin(results), f, ensure_ascii=False, indent=2, default=str)
             print(f"✓ 分析结果已保存到: {full_filename}")
             return full_filename
         except Exception as e:
             print(f"保存结果时出错: {e}")
             return ""
     
+    def cached_analysis(self, key: Hashable, compute_fn: Callable[[], Dict],
+                        cache_dir: str = "ticker_data/cache") -> Dict:
+        """
+        按键缓存分析结果到磁盘，命中时直接读取，否则计算后写入
+        
+        Args:
+            key: 缓存键（需包含数据的失效标记，如最新数据时间戳）
+            compute_fn: 未命中时调用的计算函数
+            cache_dir: 缓存目录
+            
+        Returns:
+            分析结果字典
+        """
+        digest = hashlib.sha256(repr((ANALYSIS_CACHE_VERSION, key)).encode('utf-8')).hexdigest()
+        cache_file = os.path.join(cache_dir, f"{digest}.pkl")
+        
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    results = pickle.load(f)
+                print(f"✓ 使用缓存的分析结果: {cache_file}")
+                return results
+            except Exception as e:
+                print(f"读取分析缓存时出错: {e}")
+        
+        results = compute_fn()
+        if results:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # 先写临时文件再替换，避免中断时留下不完整的缓存
+                tmp_file = f"{cache_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except Exception as e:
+                print(f"写入分析缓存时出错: {e}")
+        return results
+    
     @staticmethod
     def generate_chart_filename(ticker: str, analysis_type: str, extension: str = "png") -> str:
         """
@@ -64,7 +151,7 @@ class FileManager:
         Returns:
             生成的文件名（包含路径）
         """
-        timestamp = datetime.now().strftime("%Y%m%d")
+        timestamp = _today_str()
         filename = f"{ticker}_{analysis_type}_{timestamp}.{extension}"
         return f"charts/returns_analysis/{filename}"
     
@@ -81,7 +168,7 @@ class FileManager:
         Returns:
             生成的文件名（包含路径）
         """
-        timestamp = datetime.now().strftime("%Y%m%d")
+        timestamp = _today_str()
         ticker_str = "_".join(tickers[:3])  # 最多使用前3个ticker
         if len(tickers) > 3:
             ticker_str += f"_and_{len(tickers)-3}_more"
@@ -6,20 +6,115 @@ Statistics Calculator - 统计计算器
 
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Optional, Tuple, Union
+
+# 每年交易日数及其平方根，用于年化波动率和夏普比率
+TRADING_DAYS_PER_YEAR = 252
+SQRT_TRADING_DAYS = np.sqrt(TRADING_DAYS_PER_YEAR)
 
 
 class StatisticsCalculator:
     """统计计算器 - 负责各种统计指标的计算"""
     
+    # calculate_all_range_metrics结果的列顺序
+    RANGE_METRIC_COLUMNS = ['close_gain', 'close_loss', 'close_range', 'open_high', 'open_low', 'open_range']
+    
+    @staticmethod
+    def _price_arrays(data: pd.DataFrame, columns: List[str]) -> List[np.ndarray]:
+        """取出价格列为C连续的float64数组，供向量化计算使用"""
+        return [np.ascontiguousarray(data[col].to_numpy(dtype=np.float64)) for col in columns]
+    
+    @staticmethod
+    def _prev_values(values: np.ndarray) -> np.ndarray:
+        """返回前一期数值数组（首个元素为NaN），等价于shift(1)"""
+        prev = np.empty_like(values)
+        prev[0:1] = np.nan
+        prev[1:] = values[:-1]
+        return prev
+    
+    @staticmethod
+    def calculate_sign_counts(values: Union[pd.Series, np.ndarray]) -> Tuple[int, int, int]:
+        """
+        统计下跌/平盘/上涨的个数
+        
+        Args:
+            values: 无NaN的收益率Series或数组
+            
+        Returns:
+            (下跌个数, 平盘个数, 上涨个数) 元组
+        """
+        values = np.asarray(values)
+        positive = np.count_nonzero(values > 0)
+        negative = np.count_nonzero(values < 0)
+        return negative, len(values) - positive - negative, positive
+    
     @staticmethod
-    def calculate_returns(data: pd.DataFrame, price_column: str = 'Close') -> pd.Series:
+    def calculate_prev_close(data: pd.DataFrame) -> np.ndarray:
+        """
+        计算前一日收盘价数组（首个元素为NaN）
+        
+        同一份数据需要多个以昨收为基准的指标时，可先调用一次，
+        再通过prev_close参数传给calculate_returns / calculate_gap_info /
+        calculate_daily_range_metrics / calculate_all_range_metrics，避免重复移位
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'Close'列
+            
+        Returns:
+            前一日收盘价数组
+        """
+        (close,) = StatisticsCalculator._price_arrays(data, ['Close'])
+        return StatisticsCalculator._prev_values(close)
+    
+    @staticmethod
+    def drop_nan_rows(values: np.ndarray, index: pd.Index) -> Tuple[np.ndarray, pd.Index]:
+        """剔除含NaN的行（一维或二维数组），同时裁剪对应的日期索引"""
+        mask = ~np.isnan(values) if values.ndim == 1 else ~np.isnan(values).any(axis=1)
+        if mask.all():
+            return values, index
+        return values[mask], index[mask]
+    
+    @staticmethod
+    def calculate_returns_np(data: pd.DataFrame, price_column: str = 'Close',
+                             prev_close: Optional[np.ndarray] = None) -> Tuple[np.ndarray, pd.Index]:
+        """
+        计算每日涨跌幅（收益率），返回数组形式
+        
+        与calculate_returns口径一致，但不构造Series：数值和日期索引分开返回，
+        统计计算直接使用数组，只有需要按日期定位（如极值日期）时才用索引
+        
+        Args:
+            data: 股票数据DataFrame
+            price_column: 价格列名
+            prev_close: 预先算好的前一期价格数组（可选，须与price_column对应）
+            
+        Returns:
+            (涨跌幅数组（百分比）, 对应的日期索引) 元组，已去除NaN
+        """
+        if price_column not in data.columns:
+            raise ValueError(f"Column '{price_column}' not found in data")
+        
+        (prices,) = StatisticsCalculator._price_arrays(data, [price_column])
+        if prev_close is not None:
+            returns = (prices / prev_close - 1) * 100
+            return StatisticsCalculator.drop_nan_rows(returns, data.index)
+        
+        # 首日没有前一日可比，直接用错位切片相除，在同一缓冲区内完成后续运算
+        returns = np.empty(max(len(prices) - 1, 0), dtype=np.float64)
+        np.divide(prices[1:], prices[:-1], out=returns)
+        returns -= 1
+        returns *= 100
+        return StatisticsCalculator.drop_nan_rows(returns, data.index[1:])
+    
+    @staticmethod
+    def calculate_returns(data: pd.DataFrame, price_column: str = 'Close',
+                          prev_close: Optional[np.ndarray] = None) -> pd.Series:
         """
         计算每日涨跌幅（收益率）
 
         具体做法：
         - 取出指定的价格列（如'Close'收盘价）
-        - 用pandas的pct_change()方法，计算相邻两天的百分比变化
+        - 计算相邻两天的百分比变化（与pandas的pct_change()口径一致）
           即：(今日价格 - 昨日价格) / 昨日价格
         - 结果乘以100，得到百分比形式的涨跌幅
         - 去除首行的NaN（因为第一天没有前一天可比）
@@ -27,16 +122,36 @@ class StatisticsCalculator:
         Args:
             data: 股票数据DataFrame
             price_column: 价格列名
+            prev_close: 预先算好的前一期价格数组（可选，须与price_column对应）
 
         Returns:
             每日涨跌幅Series（百分比）
         """
-        if price_column not in data.columns:
-            raise ValueError(f"Column '{price_column}' not found in data")
+        returns, index = StatisticsCalculator.calculate_returns_np(data, price_column, prev_close)
+        return pd.Series(returns, index=index, name=price_column)
+    
+    @staticmethod
+    def calculate_intraday_returns_np(data: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+        """
+        计算日内涨跌幅（开盘到收盘），返回数组形式
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'Open'和'Close'列
+            
+        Returns:
+            (日内涨跌幅数组（百分比）, 对应的日期索引) 元组，已去除NaN
+        """
+        required_columns = ['Open', 'Close']
+        missing_columns = [col for col in required_columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {missing_columns}")
         
-        # 计算每日涨跌幅百分比
-        returns = data[price_column].pct_change() * 100
-        return returns.dropna()
+        # 计算日内涨跌幅百分比：(收盘价 - 开盘价) / 开盘价 * 100
+        open_, close = StatisticsCalculator._price_arrays(data, ['Open', 'Close'])
+        intraday_returns = np.subtract(close, open_)
+        intraday_returns /= open_
+        intraday_returns *= 100
+        return StatisticsCalculator.drop_nan_rows(intraday_returns, data.index)
     
     @staticmethod
     def calculate_intraday_returns(data: pd.DataFrame) -> pd.Series:
@@ -54,17 +169,41 @@ class StatisticsCalculator:
         Returns:
             日内涨跌幅Series（百分比）
         """
+        intraday_returns, index = StatisticsCalculator.calculate_intraday_returns_np(data)
+        return pd.Series(intraday_returns, index=index)
+    
+    @staticmethod
+    def calculate_intraday_and_gap_np(data: pd.DataFrame,
+                                      prev_close: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+        """
+        一次读取开盘/收盘价，同时计算日内涨跌幅和开盘缺口
+        
+        两个指标写入同一个(N, 2)数组，均未去除NaN（开盘缺口首行为NaN），
+        逐行与日期索引对应，可直接交给calculate_gap_grouped_stats_np分组
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'Open'和'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
+            
+        Returns:
+            (日内涨跌幅数组, 开盘缺口数组, 日期索引) 元组，单位为百分比
+        """
         required_columns = ['Open', 'Close']
         missing_columns = [col for col in required_columns if col not in data.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
-        # 计算日内涨跌幅百分比：(收盘价 - 开盘价) / 开盘价 * 100
-        intraday_returns = (data['Close'] - data['Open']) / data['Open'] * 100
-        return intraday_returns.dropna()
+        open_, close = StatisticsCalculator._price_arrays(data, ['Open', 'Close'])
+        if prev_close is None:
+            prev_close = StatisticsCalculator._prev_values(close)
+        
+        out = np.empty((len(open_), 2), dtype=np.float64)
+        out[:, 0] = (close - open_) / open_ * 100
+        out[:, 1] = (open_ - prev_close) / prev_close * 100
+        return out[:, 0], out[:, 1], data.index
     
     @staticmethod
-    def calculate_gap_info(data: pd.DataFrame) -> pd.Series:
+    def calculate_gap_info(data: pd.DataFrame, prev_close: Optional[np.ndarray] = None) -> pd.Series:
         """
         计算开盘缺口信息
         
@@ -75,6 +214,7 @@ class StatisticsCalculator:
         
         Args:
             data: 股票数据DataFrame，必须包含'Open'和'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
             
         Returns:
             开盘缺口Series（百分比）
@@ -85,12 +225,42 @@ class StatisticsCalculator:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
         # 计算开盘缺口：(今日开盘价 - 昨日收盘价) / 昨日收盘价 * 100
-        prev_close = data['Close'].shift(1)
-        gap = (data['Open'] - prev_close) / prev_close * 100
-        return gap.dropna()
+        if prev_close is None:
+            prev_close = StatisticsCalculator.calculate_prev_close(data)
+        (open_,) = StatisticsCalculator._price_arrays(data, ['Open'])
+        gap = (open_ - prev_close) / prev_close * 100
+        return pd.Series(gap, index=data.index).dropna()
     
     @staticmethod
-    def calculate_daily_range_metrics(data: pd.DataFrame) -> tuple:
+    def calculate_daily_range_metrics_np(data: pd.DataFrame,
+                                         prev_close: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+        """
+        计算日内波动范围指标（昨收起点），返回数组形式
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'High', 'Low', 'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
+            
+        Returns:
+            (最大涨幅数组, 最大跌幅数组, 对应的日期索引) 元组，单位为百分比，已去除NaN行
+        """
+        required_columns = ['High', 'Low', 'Close']
+        missing_columns = [col for col in required_columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {missing_columns}")
+        
+        high, low = StatisticsCalculator._price_arrays(data, ['High', 'Low'])
+        if prev_close is None:
+            prev_close = StatisticsCalculator.calculate_prev_close(data)
+        
+        metrics = np.empty((len(high), 2), dtype=np.float64)
+        metrics[:, 0] = (high - prev_close) / prev_close * 100
+        metrics[:, 1] = (low - prev_close) / prev_close * 100
+        metrics, index = StatisticsCalculator.drop_nan_rows(metrics, data.index)
+        return metrics[:, 0], metrics[:, 1], index
+    
+    @staticmethod
+    def calculate_daily_range_metrics(data: pd.DataFrame, prev_close: Optional[np.ndarray] = None) -> tuple:
         """
         计算日内波动范围指标
         
@@ -100,25 +270,37 @@ class StatisticsCalculator:
         
         Args:
             data: 股票数据DataFrame，必须包含'High', 'Low', 'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
             
         Returns:
             (最大涨幅Series, 最大跌幅Series) 元组，单位为百分比
         """
-        required_columns = ['High', 'Low', 'Close']
+        max_gain, max_loss, index = StatisticsCalculator.calculate_daily_range_metrics_np(data, prev_close)
+        return pd.Series(max_gain, index=index), pd.Series(max_loss, index=index)
+    
+    @staticmethod
+    def calculate_open_to_extremes_metrics_np(data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+        """
+        计算从今日开盘价到今日高低点的波动范围指标，返回数组形式
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'High', 'Low', 'Open'列
+            
+        Returns:
+            (开盘到高点涨幅数组, 开盘到低点跌幅数组, 对应的日期索引) 元组，单位为百分比，已去除NaN行
+        """
+        required_columns = ['High', 'Low', 'Open']
         missing_columns = [col for col in required_columns if col not in data.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
-        # 获取前一日收盘价
-        prev_close = data['Close'].shift(1)
-        
-        # 计算最大涨幅：(今日最高价 - 昨日收盘价) / 昨日收盘价 * 100
-        max_gain = (data['High'] - prev_close) / prev_close * 100
+        high, low, open_ = StatisticsCalculator._price_arrays(data, ['High', 'Low', 'Open'])
         
-        # 计算最大跌幅：(今日最低价 - 昨日收盘价) / 昨日收盘价 * 100
-        max_loss = (data['Low'] - prev_close) / prev_close * 100
-        
-        return max_gain.dropna(), max_loss.dropna()
+        metrics = np.empty((len(open_), 2), dtype=np.float64)
+        metrics[:, 0] = (high - open_) / open_ * 100
+        metrics[:, 1] = (low - open_) / open_ * 100
+        metrics, index = StatisticsCalculator.drop_nan_rows(metrics, data.index)
+        return metrics[:, 0], metrics[:, 1], index
     
     @staticmethod
     def calculate_open_to_extremes_metrics(data: pd.DataFrame) -> tuple:
@@ -135,30 +317,205 @@ class StatisticsCalculator:
         Returns:
             (开盘到高点涨幅Series, 开盘到低点跌幅Series) 元组，单位为百分比
         """
-        required_columns = ['High', 'Low', 'Open']
+        open_to_high, open_to_low, index = StatisticsCalculator.calculate_open_to_extremes_metrics_np(data)
+        return pd.Series(open_to_high, index=index), pd.Series(open_to_low, index=index)
+    
+    @staticmethod
+    def calculate_all_range_metrics_np(data: pd.DataFrame,
+                                       prev_close: Optional[np.ndarray] = None) -> Tuple[np.ndarray, pd.Index]:
+        """
+        一次性计算双起点（昨收&今开）的全部日内波动范围指标，返回数组形式
+        
+        只读取一次OHLC数组，写入同一个(N, 6)数组的六列（列顺序见RANGE_METRIC_COLUMNS）：
+        - close_gain / close_loss: 昨收→今日高点涨幅 / 昨收→今日低点跌幅
+        - close_range: 昨收起点的波动范围
+        - open_high / open_low: 今开→今日高点涨幅 / 今开→今日低点跌幅
+        - open_range: 今开起点的波动范围
+        
+        Args:
+            data: 股票数据DataFrame，必须包含'Open', 'High', 'Low', 'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
+            
+        Returns:
+            ((N, 6)指标数组（百分比）, 日期索引) 元组，昨收起点指标首行为NaN
+        """
+        required_columns = ['Open', 'High', 'Low', 'Close']
         missing_columns = [col for col in required_columns if col not in data.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
-        # 计算从开盘到高点的涨幅：(今日最高价 - 今日开盘价) / 今日开盘价 * 100
-        open_to_high = (data['High'] - data['Open']) / data['Open'] * 100
+        open_, high, low = StatisticsCalculator._price_arrays(data, ['Open', 'High', 'Low'])
+        if prev_close is None:
+            prev_close = StatisticsCalculator.calculate_prev_close(data)
+        
+        out = np.empty((len(open_), 6), dtype=np.float64)
+        out[:, 0] = (high - prev_close) / prev_close * 100
+        out[:, 1] = (low - prev_close) / prev_close * 100
+        np.subtract(out[:, 0], out[:, 1], out=out[:, 2])
+        out[:, 3] = (high - open_) / open_ * 100
+        out[:, 4] = (low - open_) / open_ * 100
+        np.subtract(out[:, 3], out[:, 4], out=out[:, 5])
         
-        # 计算从开盘到低点的跌幅：(今日最低价 - 今日开盘价) / 今日开盘价 * 100
-        open_to_low = (data['Low'] - data['Open']) / data['Open'] * 100
+        return out, data.index
+    
+    @staticmethod
+    def calculate_all_range_metrics(data: pd.DataFrame, prev_close: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        一次性计算双起点（昨收&今开）的全部日内波动范围指标
         
-        return open_to_high.dropna(), open_to_low.dropna()
+        Args:
+            data: 股票数据DataFrame，必须包含'Open', 'High', 'Low', 'Close'列
+            prev_close: 预先算好的前一日收盘价数组（可选）
+            
+        Returns:
+            六列指标DataFrame（百分比），昨收起点指标首行为NaN
+        """
+        out, index = StatisticsCalculator.calculate_all_range_metrics_np(data, prev_close)
+        return pd.DataFrame(out, index=index, columns=StatisticsCalculator.RANGE_METRIC_COLUMNS)
     
     @staticmethod
-    def calculate_basic_stats(data: pd.Series) -> Dict:
+    def calculate_basic_stats(data: Union[pd.Series, np.ndarray]) -> Dict:
         """
         计算基础统计指标
         
         Args:
-            data: 数据Series
+            data: 数据Series或一维数组
             
         Returns:
             统计指标字典
         """
+        values = np.asarray(data, dtype=np.float64)
+        if len(values) == 0 or np.isnan(values).any():
+            # 空数据或含NaN时沿用pandas口径（跳过NaN）
+            return StatisticsCalculator._calculate_basic_stats_pandas(pd.Series(values))
+        
+        return StatisticsCalculator._basic_stats_kernel(values[:, np.newaxis])[0]
+    
+    @staticmethod
+    def calculate_basic_stats_batch(series_dict: Dict[str, Union[pd.Series, np.ndarray]]) -> Dict[str, Dict]:
+        """
+        批量计算多个等长Series的基础统计指标
+        
+        将各Series按列堆叠为一个(N, K)数组，均值、标准差、偏度、峰度和百分位数
+        均按列一次性计算，结果与逐个调用calculate_basic_stats一致
+        
+        Args:
+            series_dict: {名称: 数据Series或一维数组} 字典
+            
+        Returns:
+            {名称: 统计指标字典} 字典
+        """
+        lengths = {len(series) for series in series_dict.values()}
+        if len(lengths) != 1 or 0 in lengths:
+            # 长度不一致时无法堆叠，逐个计算
+            return {name: StatisticsCalculator.calculate_basic_stats(series)
+                    for name, series in series_dict.items()}
+        
+        values = np.column_stack([np.asarray(series, dtype=np.float64) for series in series_dict.values()])
+        if np.isnan(values).any():
+            return {name: StatisticsCalculator.calculate_basic_stats(series)
+                    for name, series in series_dict.items()}
+        
+        return dict(zip(series_dict, StatisticsCalculator._basic_stats_kernel(values)))
+    
+    @staticmethod
+    def _basic_stats_kernel(values: np.ndarray) -> List[Dict]:
+        """对(N, K)无NaN数组按列计算基础统计指标，每列返回一个统计字典"""
+        n = values.shape[0]
+        # 以首行为基准求均值：常数列的均值精确等于该常数，二维按列求和的舍入误差也更小
+        mean = values[0] + (values - values[0]).mean(axis=0)
+        
+        # 中心矩（与pandas的skew/kurtosis口径一致：样本偏度G1、超额峰度G2）
+        adjusted = values - mean
+        adjusted2 = adjusted ** 2
+        m2 = adjusted2.sum(axis=0)
+        m3 = (adjusted2 * adjusted).sum(axis=0)
+        m4 = (adjusted2 ** 2).sum(axis=0)
+        
+        # 常数列的中心矩只剩浮点误差，按pandas的容差（基于最大绝对值）清零，偏度/峰度返回0
+        tolerance = np.finfo(np.float64).eps * np.abs(values).max(axis=0)
+        m2 = np.where(np.abs(m2) < tolerance ** 2 * n, 0.0, m2)
+        m3 = np.where(np.abs(m3) < tolerance ** 3 * n, 0.0, m3)
+        m4 = np.where(np.abs(m4) < tolerance ** 4 * n, 0.0, m4)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(m2 / (n - 1)) if n > 1 else np.full(values.shape[1], np.nan)
+            
+            if n >= 3:
+                skewness = np.where(m2 == 0, 0.0, (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5))
+            else:
+                skewness = np.full(values.shape[1], np.nan)
+            
+            if n >= 4:
+                adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+                numerator = n * (n + 1) * (n - 1) * m4
+                denominator = (n - 2) * (n - 3) * m2 ** 2
+                kurtosis = np.where(denominator == 0, 0.0, numerator / denominator - adj)
+            else:
+                kurtosis = np.full(values.shape[1], np.nan)
+        
+        percentiles = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+        percentile_values = StatisticsCalculator._fast_percentiles(values, percentiles)
+        medians = np.median(values, axis=0)
+        mins = values.min(axis=0)
+        maxs = values.max(axis=0)
+        
+        results = []
+        for i in range(values.shape[1]):
+            column = values[:, i]
+            positive_data = column[column > 0]
+            negative_data = column[column < 0]
+            
+            results.append({
+                'count': n,
+                'mean': mean[i],
+                'median': medians[i],
+                'std': std[i],
+                'min': mins[i],
+                'max': maxs[i],
+                'skewness': skewness[i],
+                'kurtosis': kurtosis[i],
+                'percentiles': dict(zip(percentiles, percentile_values[:, i])),
+                'positive_percentiles': (dict(zip(percentiles, StatisticsCalculator._fast_percentiles(positive_data, percentiles)))
+                                         if len(positive_data) > 0 else {}),
+                'negative_percentiles': (dict(zip(percentiles, StatisticsCalculator._fast_percentiles(negative_data, percentiles)))
+                                         if len(negative_data) > 0 else {})
+            })
+        
+        return results
+    
+    @staticmethod
+    def _fast_percentiles(values: np.ndarray, percentiles: List[int]) -> np.ndarray:
+        """
+        按列计算百分位数（线性插值，结果与np.percentile默认口径逐位一致）
+        
+        只用np.partition把需要的相邻两个次序统计量放到位，避免整列排序
+        
+        Args:
+            values: 一维或(N, K)二维无NaN数组，沿axis=0计算
+            percentiles: 百分位列表（0-100）
+            
+        Returns:
+            百分位数数组，形状为(len(percentiles),)或(len(percentiles), K)
+        """
+        n = values.shape[0]
+        virtual = (n - 1) * (np.asarray(percentiles, dtype=np.float64) / 100)
+        lower = np.floor(virtual).astype(np.intp)
+        upper = np.minimum(lower + 1, n - 1)
+        partitioned = np.partition(values, np.unique(np.concatenate([lower, upper])), axis=0)
+        below = partitioned[lower]
+        above = partitioned[upper]
+        
+        weights = virtual - lower
+        if values.ndim > 1:
+            weights = weights[:, np.newaxis]
+        # 与numpy的插值写法一致：权重>=0.5时从上界回推，保证数值完全相同
+        diff = above - below
+        return np.where(weights >= 0.5, above - diff * (1 - weights), below + diff * weights)
+    
+    @staticmethod
+    def _calculate_basic_stats_pandas(data: pd.Series) -> Dict:
+        """使用pandas逐项计算基础统计指标（空数据或含NaN时使用）"""
         stats = {
             'count': len(data),
             'mean': data.mean(),
@@ -197,46 +554,98 @@ class StatisticsCalculator:
         return stats
     
     @staticmethod
-    def calculate_return_metrics(daily_returns: pd.Series) -> Dict:
+    def calculate_return_metrics(daily_returns: Union[pd.Series, np.ndarray]) -> Dict:
         """
         计算收益率相关的专门指标
         
         Args:
-            daily_returns: 日收益率Series
+            daily_returns: 日收益率Series或一维数组
             
         Returns:
             收益率指标字典
         """
+        values = np.asarray(daily_returns, dtype=np.float64)
+        n = len(values)
+        
+        # 均值和标准差沿用pandas口径：跳过NaN，标准差为样本标准差(ddof=1)
+        valid = values[~np.isnan(values)]
+        mean = valid.mean() if len(valid) > 0 else np.nan
+        std = valid.std(ddof=1) if len(valid) > 1 else np.nan
+        
+        # 涨/跌/平天数一次统计（NaN不计入任何一类）
+        negative_days, flat_days, positive_days = StatisticsCalculator.calculate_sign_counts(valid)
+        
         metrics = {
-            'positive_days': (daily_returns > 0).sum(),
-            'negative_days': (daily_returns < 0).sum(),
-            'flat_days': (daily_returns == 0).sum(),
-            'positive_ratio': (daily_returns > 0).sum() / len(daily_returns),
-            'negative_ratio': (daily_returns < 0).sum() / len(daily_returns),
-            'volatility_annual': daily_returns.std() * np.sqrt(252),  # 年化波动率
+            'positive_days': positive_days,
+            'negative_days': negative_days,
+            'flat_days': flat_days,
+            'positive_ratio': positive_days / n if n > 0 else np.nan,
+            'negative_ratio': negative_days / n if n > 0 else np.nan,
+            'volatility_annual': std * SQRT_TRADING_DAYS,  # 年化波动率
         }
         
         # 计算夏普比率（假设无风险利率为0）
-        if daily_returns.std() > 0:
-            metrics['sharpe_ratio'] = (daily_returns.mean() * 252) / (daily_returns.std() * np.sqrt(252))
+        if std > 0:
+            metrics['sharpe_ratio'] = (mean * TRADING_DAYS_PER_YEAR) / (std * SQRT_TRADING_DAYS)
         else:
             metrics['sharpe_ratio'] = 0
             
         return metrics
     
     @staticmethod
-    def calculate_correlation_matrix(returns_dict: Dict[str, pd.Series]) -> pd.DataFrame:
+    def calculate_correlation_matrix(returns_dict: Union[Dict[str, pd.Series], pd.DataFrame]) -> pd.DataFrame:
         """
         计算多个股票收益率的相关性矩阵
         
         Args:
-            returns_dict: {ticker: returns_series} 字典
+            returns_dict: {ticker: returns_series} 字典，或已按日期对齐的收益率矩阵DataFrame
             
         Returns:
             相关性矩阵DataFrame
         """
-        returns_df = pd.DataFrame(returns_dict)
-        return returns_df.corr()
+        if isinstance(returns_dict, pd.DataFrame):
+            returns_df = returns_dict
+        else:
+            returns_df = pd.DataFrame(returns_dict)
+        values = returns_df.to_numpy(dtype=np.float64)
+        
+        # 日期不完全重合时按pandas的逐对（pairwise）口径处理；
+        # 两列时逐对与整行剔除结果一致，可直接剔除含NaN的行
+        complete_rows = ~np.isnan(values).any(axis=1)
+        if not complete_rows.all() and values.shape[1] > 2:
+            corr = StatisticsCalculator._pairwise_corr(values)
+        else:
+            corr = np.atleast_2d(np.corrcoef(values[complete_rows], rowvar=False))
+        return pd.DataFrame(corr, index=returns_df.columns, columns=returns_df.columns)
+    
+    @staticmethod
+    def _pairwise_corr(values: np.ndarray) -> np.ndarray:
+        """
+        含NaN的(N, K)矩阵的逐对相关系数（每一对只使用两列都有值的行，同DataFrame.corr()）
+        
+        把缺失值置0并配合有效掩码，用几次(K, K)矩阵乘法一次性得到所有列对的
+        样本数、和、平方和与交叉积，不再逐对循环
+        """
+        valid = ~np.isnan(values)
+        # 先按列均值平移（不改变相关系数），减小求和公式的数值误差
+        centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+        mask = valid.astype(np.float64)
+        
+        counts = mask.T @ mask                         # 每对的共同样本数
+        sums = centered.T @ mask                       # sums[i, j]: 列i在(i, j)共同行上的和
+        squares = (centered * centered).T @ mask       # 列i在(i, j)共同行上的平方和
+        cross = centered.T @ centered                  # 交叉积
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = cross - sums * sums.T / counts
+            var_i = squares - sums * sums / counts
+            corr = cov / np.sqrt(var_i * var_i.T)
+        
+        corr[counts < 2] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return corr
     
     @staticmethod
     def calculate_drawdown(price_series: pd.Series) -> Dict:
@@ -249,41 +658,38 @@ class StatisticsCalculator:
         Returns:
             回撤指标字典
         """
-        # 计算累计收益
-        cumulative = (1 + price_series.pct_change()).cumprod()
+        prices = np.asarray(price_series, dtype=np.float64)
+        
+        # 计算累计收益（口径同pct_change().cumprod()：首日为NaN，缺失值处保持NaN、不中断累乘）
+        growth = prices / StatisticsCalculator._prev_values(prices)
+        cumulative = np.nancumprod(growth)
+        cumulative[np.isnan(growth)] = np.nan
         
-        # 计算滚动最大值
-        rolling_max = cumulative.expanding().max()
+        # 计算滚动最大值（fmax忽略NaN）
+        rolling_max = np.fmax.accumulate(cumulative) if len(cumulative) > 0 else cumulative
         
         # 计算回撤
         drawdown = (cumulative - rolling_max) / rolling_max
         
+        valid = drawdown[~np.isnan(drawdown)]
         return {
-            'max_drawdown': drawdown.min(),
+            'max_drawdown': valid.min() if len(valid) > 0 else np.nan,
             'max_drawdown_duration': StatisticsCalculator._calculate_max_drawdown_duration(drawdown),
-            'current_drawdown': drawdown.iloc[-1] if len(drawdown) > 0 else 0
+            'current_drawdown': drawdown[-1] if len(drawdown) > 0 else 0
         }
     
     @staticmethod
-    def _calculate_max_drawdown_duration(drawdown: pd.Series) -> int:
-        """计算最大回撤持续时间"""
-        is_drawdown = drawdown < 0
-        drawdown_periods = []
-        current_period = 0
-        
-        for is_dd in is_drawdown:
-            if is_dd:
-                current_period += 1
-            else:
-                if current_period > 0:
-                    drawdown_periods.append(current_period)
-                current_period = 0
-        
-        # 添加最后一个回撤期（如果存在）
-        if current_period > 0:
-            drawdown_periods.append(current_period)
-        
-        return max(drawdown_periods) if drawdown_periods else 0
+    def _calculate_max_drawdown_duration(drawdown: Union[pd.Series, np.ndarray]) -> int:
+        """计算最大回撤持续时间（用游程编码找出最长的连续回撤区间）"""
+        is_drawdown = np.asarray(drawdown < 0, dtype=np.int8)
+        if not is_drawdown.any():
+            return 0
+        
+        # 首尾补0后差分：+1为回撤开始，-1为回撤结束
+        edges = np.diff(np.concatenate(([0], is_drawdown, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return int((ends - starts).max())
     
     @staticmethod
     def calculate_gap_grouped_stats(intraday_returns: pd.Series, gaps: pd.Series) -> Dict:
@@ -302,24 +708,44 @@ class StatisticsCalculator:
         Returns:
             分组统计结果字典
         """
-        # 确保两个Series的索引对齐
-        aligned_data = pd.DataFrame({
-            'intraday_returns': intraday_returns,
-            'gaps': gaps
-        }).dropna()
+        # 按日期对齐后转为数组
+        intraday_returns, gaps = intraday_returns.align(gaps, join='inner')
+        return StatisticsCalculator.calculate_gap_grouped_stats_np(
+            intraday_returns.to_numpy(dtype=np.float64), gaps.to_numpy(dtype=np.float64))
+    
+    @staticmethod
+    def calculate_gap_grouped_stats_np(returns_values: np.ndarray, gap_values: np.ndarray) -> Dict:
+        """
+        按开盘缺口类型分组计算日内收益率统计（数组形式，分类口径同calculate_gap_grouped_stats）
+        
+        Args:
+            returns_values: 日内收益率数组
+            gap_values: 与之逐日对应的开盘缺口数组（可含NaN）
+            
+        Returns:
+            分组统计结果字典
+        """
+        # 剔除任一侧为NaN的日期
+        valid = ~(np.isnan(returns_values) | np.isnan(gap_values))
+        returns_values = returns_values[valid]
+        gap_values = gap_values[valid]
         
-        if len(aligned_data) == 0:
+        total_days = len(returns_values)
+        if total_days == 0:
             return {}
         
-        # 分类开盘类型（简单分类）
-        gap_up_mask = aligned_data['gaps'] > 0
-        gap_down_mask = aligned_data['gaps'] < 0
-        gap_flat_mask = aligned_data['gaps'] == 0
+        # 分类开盘类型（简单分类），用布尔掩码直接切分数组
+        gap_up_mask = gap_values > 0
+        gap_down_mask = gap_values < 0
+        gap_flat_mask = ~(gap_up_mask | gap_down_mask)
+        
+        gap_up_returns = returns_values[gap_up_mask]
+        gap_down_returns = returns_values[gap_down_mask]
+        gap_flat_returns = returns_values[gap_flat_mask]
         
         results = {}
         
         # 高开统计
-        gap_up_returns = aligned_data.loc[gap_up_mask, 'intraday_returns']
         if len(gap_up_returns) > 0:
             results['gap_up'] = {
                 'count': len(gap_up_returns),
@@ -328,7 +754,6 @@ class StatisticsCalculator:
             }
         
         # 低开统计
-        gap_down_returns = aligned_data.loc[gap_down_mask, 'intraday_returns']
         if len(gap_down_returns) > 0:
             results['gap_down'] = {
                 'count': len(gap_down_returns),
@@ -337,7 +762,6 @@ class StatisticsCalculator:
             }
         
         # 平开统计
-        gap_flat_returns = aligned_data.loc[gap_flat_mask, 'intraday_returns']
         if len(gap_flat_returns) > 0:
             results['gap_flat'] = {
                 'count': len(gap_flat_returns),
@@ -345,15 +769,17 @@ class StatisticsCalculator:
                 'description': '平开日内表现（开盘价 = 前日收盘价）'
             }
         
-        # 添加总体统计信息
+        # 添加总体统计信息（各组天数取一次，比例共用同一个倒数）
+        up_days, down_days, flat_days = len(gap_up_returns), len(gap_down_returns), len(gap_flat_returns)
+        inv_total = 1.0 / total_days
         results['summary'] = {
-            'total_days': len(aligned_data),
-            'gap_up_days': len(gap_up_returns),
-            'gap_down_days': len(gap_down_returns),
-            'gap_flat_days': len(gap_flat_returns),
-            'gap_up_ratio': len(gap_up_returns) / len(aligned_data) if len(aligned_data) > 0 else 0,
-            'gap_down_ratio': len(gap_down_returns) / len(aligned_data) if len(aligned_data) > 0 else 0,
-            'gap_flat_ratio': len(gap_flat_returns) / len(aligned_data) if len(aligned_data) > 0 else 0,
+            'total_days': total_days,
+            'gap_up_days': up_days,
+            'gap_down_days': down_days,
+            'gap_flat_days': flat_days,
+            'gap_up_ratio': up_days * inv_total,
+            'gap_down_ratio': down_days * inv_total,
+            'gap_flat_ratio': flat_days * inv_total,
             'classification': '简单分类（>0 高开, <0 低开, =0 平开）'
         }
         
@@ -4,8 +4,7 @@ Returns Visualizer - 收益率可视化工具
 专门用于创建收益率相关的各种图表
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+# matplotlib/seaborn 在首次绘图时才导入，只导入本模块（或只获取数据）的流程不承担其导入开销
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -13,24 +12,89 @@ from typing import Dict, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
-# 设置中文字体支持
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+# 已应用的matplotlib样式（样式是进程全局的，同一样式只需应用一次）
+_APPLIED_STYLE = None
+
+
+def _apply_style(style: str):
+    """应用matplotlib样式并设置中文字体支持（字体在样式之后设置，避免被样式覆盖）"""
+    global _APPLIED_STYLE
+    if _APPLIED_STYLE == style:
+        return
+    import matplotlib.pyplot as plt
+    plt.style.use(style)
+    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    _APPLIED_STYLE = style
+
+
+def _box_stats(values: np.ndarray, q1: float, med: float, q3: float, label: str) -> Dict:
+    """
+    由已计算的四分位数构造ax.bxp所需的统计量（须线为1.5倍IQR，与ax.boxplot一致），省去重新排序求分位数
+    
+    Args:
+        values: 收益率数组
+        q1, med, q3: 25%、50%、75%分位数
+        label: 箱体标签
+        
+    Returns:
+        ax.bxp使用的统计字典
+    """
+    iqr = q3 - q1
+    low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = values[(values >= low) & (values <= high)]
+    whislo = min(inside.min(), q1) if inside.size else q1
+    whishi = max(inside.max(), q3) if inside.size else q3
+    return dict(med=med, q1=q1, q3=q3, whislo=whislo, whishi=whishi,
+                fliers=values[(values < low) | (values > high)], label=label)
 
 
 class ReturnsVisualizer:
     """收益率可视化器"""
     
-    def __init__(self, style: str = 'seaborn-v0_8', figsize: tuple = (16, 10)):
+    def __init__(self, style: str = 'seaborn-v0_8', figsize: tuple = (16, 10), interactive: bool = True,
+                 dpi: int = 300, png_compress_level: int = 1):
         """
         初始化可视化器
         
         Args:
             style: matplotlib样式
             figsize: 图表大小
+            interactive: 是否在保存后显示图表；为False时（批量生成）复用同一个Figure且不调用plt.show()
+            dpi: 保存图表的分辨率（批量生成时可调低，如150，像素数减为1/4）
+            png_compress_level: PNG的zlib压缩级别（0-9，越低编码越快、文件越大）
         """
-        plt.style.use(style)
+        _apply_style(style)
         self.figsize = figsize
+        self.interactive = interactive
+        self.dpi = dpi
+        self.png_compress_level = png_compress_level
+        self._fig = None
+    
+    def _new_figure(self):
+        """返回用于绘图的空白Figure（非交互模式下清空并复用同一个Figure）"""
+        import matplotlib.pyplot as plt
+        if self.interactive:
+            return plt.figure(figsize=self.figsize)
+        if self._fig is None:
+            self._fig = plt.figure(figsize=self.figsize)
+        else:
+            self._fig.clf()
+        return self._fig
+    
+    def _finish_figure(self, fig, filename: str, message: str):
+        """保存图表，交互模式下再显示"""
+        save_kwargs = {}
+        if str(filename).lower().endswith('.png'):
+            save_kwargs['pil_kwargs'] = {'compress_level': self.png_compress_level, 'optimize': False}
+        fig.savefig(filename, dpi=self.dpi, bbox_inches='tight', facecolor='white', **save_kwargs)
+        print(f"\n📊 {message}: {filename}")
+        
+        if self.interactive:
+            import matplotlib.pyplot as plt
+            plt.show()
     
     def create_returns_analysis_plot(self, 
                                    ticker: str, 
@@ -49,7 +113,7 @@ class ReturnsVisualizer:
         Returns:
             保存的文件名
         """
-        fig = plt.figure(figsize=self.figsize)
+        fig = self._new_figure()
         gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.3)
         
         # 1. 历史收益率时间序列图
@@ -62,7 +126,7 @@ class ReturnsVisualizer:
         self._plot_boxplot_with_percentiles(fig.add_subplot(gs[1, 1]), daily_returns, stats, ticker)
         
         # 设置总标题
-        plt.suptitle(f'{ticker} Daily Returns Analysis - {datetime.now().strftime("%Y-%m-%d")}', 
+        fig.suptitle(f'{ticker} Daily Returns Analysis - {datetime.now().strftime("%Y-%m-%d")}', 
                     fontsize=16, fontweight='bold', y=0.98)
         
         # 保存图表
@@ -71,16 +135,14 @@ class ReturnsVisualizer:
             filename = FileManager.generate_chart_filename(ticker, 'daily_returns_analysis')
         else:
             filename = save_path
-            
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        print(f"\n📊 图表已保存为: {filename}")
         
-        plt.show()
+        self._finish_figure(fig, filename, "图表已保存为")
         return filename
     
     def _plot_time_series(self, ax, daily_returns: pd.Series, stats: Dict, ticker: str):
         """绘制时间序列图"""
-        daily_returns.plot(ax=ax, alpha=0.7, color='steelblue', linewidth=0.8)
+        # 直接在数组上绘制，跳过pandas绘图接口的分派开销；datetime64索引由matplotlib按日期轴处理
+        ax.plot(daily_returns.index.to_numpy(), daily_returns.to_numpy(), alpha=0.7, color='steelblue', linewidth=0.8)
         ax.axhline(y=0, color='red', linestyle='--', alpha=0.5)
         ax.axhline(y=stats['mean'], color='green', linestyle='--', alpha=0.7, 
                   label=f"Mean: {stats['mean']:.3f}%")
@@ -105,10 +167,14 @@ class ReturnsVisualizer:
         ax.axvline(stats['mean'], color='green', linestyle='--', 
                   label=f"Mean: {stats['mean']:.3f}%", linewidth=2)
         
-        # 添加正态分布拟合曲线
-        x = np.linspace(daily_returns.min(), daily_returns.max(), 100)
-        normal_dist = (1/(stats['std'] * np.sqrt(2 * np.pi))) * \
-                     np.exp(-0.5 * ((x - stats['mean'])/stats['std'])**2)
+        # 添加正态分布拟合曲线（系数预先算成标量，样本少时曲线点数也减半）
+        n_points = 100 if len(daily_returns) > 100 else 50
+        x = np.linspace(daily_returns.min(), daily_returns.max(), n_points)
+        z = (x - stats['mean']) * (1.0 / stats['std'])
+        z *= z
+        z *= -0.5
+        normal_dist = np.exp(z, out=z)
+        normal_dist *= 1.0 / (stats['std'] * _SQRT_2PI)
         ax.plot(x, normal_dist, 'r-', linewidth=2, alpha=0.8, label='Normal Distribution')
         
         ax.set_title(f'{ticker} Daily Returns Distribution', fontsize=14, fontweight='bold')
@@ -119,8 +185,12 @@ class ReturnsVisualizer:
     
     def _plot_boxplot_with_percentiles(self, ax, daily_returns: pd.Series, stats: Dict, ticker: str):
         """绘制箱线图和百分位数"""
-        # 箱线图
-        box_plot = ax.boxplot([daily_returns], patch_artist=True, labels=[ticker])
+        from matplotlib.collections import LineCollection
+        
+        # 箱线图：四分位数直接取自stats中已算好的百分位数
+        percentiles = stats['percentiles']
+        box_plot = ax.bxp([_box_stats(daily_returns.to_numpy(dtype=np.float64), percentiles[25],
+                                      percentiles[50], percentiles[75], ticker)], patch_artist=True)
         box_plot['boxes'][0].set_facecolor('lightgreen')
         box_plot['boxes'][0].set_alpha(0.7)
         
@@ -128,9 +198,17 @@ class ReturnsVisualizer:
         percentiles_to_show = [5, 25, 50, 75, 95]
         colors = ['red', 'orange', 'blue', 'orange', 'red']
         
-        for i, (p, color) in enumerate(zip(percentiles_to_show, colors)):
-            value = stats['percentiles'][p]
-            ax.axhline(y=value, color=color, linestyle=':', alpha=0.8, linewidth=1.5)
+        values = [stats['percentiles'][p] for p in percentiles_to_show]
+        
+        # 所有百分位水平线合并为一个LineCollection（x为坐标轴比例，y为数据坐标，与axhline一致）
+        segments = [[(0, value), (1, value)] for value in values]
+        ax.add_collection(LineCollection(segments, colors=colors, linestyles=':', linewidths=1.5,
+                                         alpha=0.8, transform=ax.get_yaxis_transform()),
+                          autolim=False)
+        ax.update_datalim([(1, value) for value in values], updatex=False)
+        ax.autoscale_view(scalex=False)
+        
+        for p, value, color in zip(percentiles_to_show, values, colors):
             ax.text(1.1, value, f'{p}%: {value:.2f}%', 
                    verticalalignment='center', fontsize=10, color=color)
         
@@ -140,33 +218,40 @@ class ReturnsVisualizer:
     
     def create_comparison_plot(self, 
                              returns_data: Dict[str, pd.Series], 
-                             save_path: Optional[str] = None) -> str:
+                             save_path: Optional[str] = None,
+                             corr_df: Optional[pd.DataFrame] = None,
+                             stats_data: Optional[Dict[str, Dict]] = None) -> str:
         """
         创建多个股票收益率对比图
         
         Args:
             returns_data: {ticker: returns_series} 字典
             save_path: 保存路径（可选）
+            corr_df: 已计算好的相关性矩阵（可选，不提供则现场计算）
+            stats_data: {ticker: 统计结果} 字典（可选，其中已算好的百分位数直接用于箱线图）
             
         Returns:
             保存的文件名
         """
-        fig, axes = plt.subplots(2, 2, figsize=self.figsize)
-        axes = axes.flatten()
+        fig = self._new_figure()
+        axes = fig.subplots(2, 2).flatten()
         
         # 时间序列对比
         ax1 = axes[0]
         for ticker, returns in returns_data.items():
-            returns.plot(ax=ax1, alpha=0.7, label=ticker, linewidth=0.8)
+            ax1.plot(returns.index.to_numpy(), returns.to_numpy(), alpha=0.7, label=ticker, linewidth=0.8)
         ax1.set_title('Returns Comparison Over Time', fontsize=14, fontweight='bold')
         ax1.set_ylabel('Daily Return (%)', fontsize=12)
         ax1.legend()
         ax1.grid(True, alpha=0.3)
         
-        # 分布对比
+        # 分布对比：所有股票共用一组分箱边界，每个股票画成一条阶梯线，而不是30个矩形
         ax2 = axes[1]
-        for ticker, returns in returns_data.items():
-            ax2.hist(returns, bins=30, alpha=0.6, label=ticker, density=True)
+        values = {ticker: returns.to_numpy(dtype=np.float64) for ticker, returns in returns_data.items()}
+        edges = np.histogram_bin_edges(np.concatenate(list(values.values())), bins=30)
+        for ticker, array in values.items():
+            counts, _ = np.histogram(array, bins=edges, density=True)
+            ax2.stairs(counts, edges, alpha=0.6, label=ticker, fill=True)
         ax2.set_title('Returns Distribution Comparison', fontsize=14, fontweight='bold')
         ax2.set_xlabel('Daily Return (%)', fontsize=12)
         ax2.set_ylabel('Density', fontsize=12)
@@ -175,9 +260,15 @@ class ReturnsVisualizer:
         
         # 箱线图对比
         ax3 = axes[2]
-        data_for_boxplot = [returns.values for returns in returns_data.values()]
-        box_plot = ax3.boxplot(data_for_boxplot, labels=list(returns_data.keys()), 
-                              patch_artist=True)
+        bxp_stats = []
+        for ticker, array in values.items():
+            percentiles = (stats_data or {}).get(ticker, {}).get('percentiles')
+            if percentiles:
+                q1, med, q3 = percentiles[25], percentiles[50], percentiles[75]
+            else:
+                q1, med, q3 = np.percentile(array, [25, 50, 75])
+            bxp_stats.append(_box_stats(array, q1, med, q3, ticker))
+        box_plot = ax3.bxp(bxp_stats, patch_artist=True)
         for patch in box_plot['boxes']:
             patch.set_facecolor('lightblue')
             patch.set_alpha(0.7)
@@ -187,11 +278,17 @@ class ReturnsVisualizer:
         
         # 相关性热图
         ax4 = axes[3]
-        corr_df = pd.DataFrame(returns_data).corr()
+        if corr_df is None:
+            # 对齐一次后直接对(T, K)数组求相关系数，不逐对构造Series
+            aligned = pd.DataFrame(returns_data).dropna()
+            n = aligned.shape[1]
+            corr = np.corrcoef(aligned.to_numpy(dtype=np.float64), rowvar=False).reshape(n, n)
+            corr_df = pd.DataFrame(corr, index=aligned.columns, columns=aligned.columns)
+        import seaborn as sns
         sns.heatmap(corr_df, annot=True, cmap='coolwarm', center=0, ax=ax4)
         ax4.set_title('Returns Correlation Matrix', fontsize=14, fontweight='bold')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # 保存图表
         if save_path is None:
@@ -199,9 +296,6 @@ class ReturnsVisualizer:
             filename = FileManager.generate_comparison_filename(list(returns_data.keys()), 'returns')
         else:
             filename = save_path
-            
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        print(f"\n📊 对比图表已保存为: {filename}")
         
-        plt.show()
+        self._finish_figure(fig, filename, "对比图表已保存为")
         return filename
@@ -6,14 +6,137 @@ with intelligent expiration based on data coverage rather than file timestamps.
 """
 
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import repeat
 from datetime import datetime, timedelta, date
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, List
 import json
 
 
+# Connection-level tuning: WAL avoids a rollback-journal fsync per transaction,
+# NORMAL sync is safe under WAL, and a larger page cache + mmap cut read syscalls
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+# Rows are clustered by the primary key in a single B-tree, so range scans over
+# (ticker, interval, date) need no secondary index lookup
+_CREATE_STOCK_DATA_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        ticker TEXT NOT NULL,
+        interval TEXT NOT NULL,
+        date DATE NOT NULL,
+        open_price REAL NOT NULL,
+        high_price REAL NOT NULL,
+        low_price REAL NOT NULL,
+        close_price REAL NOT NULL,
+        volume INTEGER,
+        cached_at INTEGER NOT NULL,
+        PRIMARY KEY (ticker, interval, date)
+    ) WITHOUT ROWID
+"""
+
+# Hot-path statements live at module level so the same SQL text is reused on
+# every call and hits the connection's prepared statement cache
+
+# Two LIMIT 1 probes seek both ends of the primary key instead of
+# aggregating MIN/MAX over every row of the ticker/interval
+_SELECT_DATE_RANGE_SQL = """
+    SELECT
+        (SELECT date FROM stock_data WHERE ticker = ?1 AND interval = ?2
+         ORDER BY date ASC LIMIT 1) as min_date,
+        (SELECT date FROM stock_data WHERE ticker = ?1 AND interval = ?2
+         ORDER BY date DESC LIMIT 1) as max_date
+"""
+
+_SELECT_RANGE_SQL = """
+    SELECT date, open_price, high_price, low_price, close_price, volume
+    FROM stock_data 
+    WHERE ticker = ? AND interval = ?
+    AND date BETWEEN ? AND ?
+    ORDER BY date ASC
+"""
+
+# Coverage check and range read in one statement: returns no rows unless the
+# cached endpoints cover the requested start (?5, already widened by
+# covering_start_limit) and end (?6). The endpoints ride along on every row
+# so the caller can memoize them
+_SELECT_COVERED_RANGE_SQL = """
+    WITH bounds AS (
+        SELECT
+            (SELECT date FROM stock_data WHERE ticker = ?1 AND interval = ?2
+             ORDER BY date ASC LIMIT 1) as min_date,
+            (SELECT date FROM stock_data WHERE ticker = ?1 AND interval = ?2
+             ORDER BY date DESC LIMIT 1) as max_date
+    )
+    SELECT date, open_price, high_price, low_price, close_price, volume,
+           (SELECT min_date FROM bounds), (SELECT max_date FROM bounds)
+    FROM stock_data
+    WHERE (SELECT min_date <= ?5 AND max_date >= ?6 FROM bounds)
+    AND ticker = ?1 AND interval = ?2
+    AND date BETWEEN ?3 AND ?4
+    ORDER BY date ASC
+"""
+
+# The newest row is rewritten by every fetch, so its cached_at tells when the
+# ticker/interval was last refreshed (a single primary-key seek)
+_SELECT_LAST_CACHED_AT_SQL = """
+    SELECT cached_at FROM stock_data WHERE ticker = ? AND interval = ?
+    ORDER BY date DESC LIMIT 1
+"""
+
+# How far after the requested start the first cached bar may lie and still
+# count as covering it: a requested start on a weekend or market holiday (or
+# mid-week/mid-month for weekly/monthly bars) has no bar of its own
+_START_SLACK = {
+    '1d': timedelta(days=4),
+    '1wk': timedelta(days=7),
+    '1mo': timedelta(days=31),
+}
+
+
+def covering_start_limit(requested_start: date, interval: str) -> date:
+    """
+    Latest first cached date that still covers a requested start date.
+    
+    Args:
+        requested_start (date): Start date requested
+        interval (str): Data interval ('1d', '1wk', '1mo')
+        
+    Returns:
+        date: requested_start plus the slack allowed for the interval
+    """
+    return requested_start + _START_SLACK.get(interval, timedelta(0))
+
+
+# Rows per multi-row INSERT; 50 rows x 9 columns stays well under SQLite's
+# bound-parameter limit
+_INSERT_BATCH_SIZE = 50
+
+
+@lru_cache(maxsize=None)
+def _multi_row_insert_sql(row_count: int) -> str:
+    """Build (once per row count) an INSERT OR REPLACE with row_count VALUES groups."""
+    values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?)"] * row_count)
+    return f"""
+    INSERT OR REPLACE INTO stock_data
+    (ticker, interval, date, open_price, high_price, low_price, close_price, volume, cached_at)
+    VALUES {values}
+"""
+
+
 class CacheManager:
     """
     SQLite-based cache manager for stock data.
@@ -35,48 +158,136 @@ class CacheManager:
         # Set up logging
         self.logger = logging.getLogger(__name__)
         
+        # One long-lived connection keeps WAL/mmap state warm between calls;
+        # the lock serializes access since it may be shared across threads
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        
+        # Reads go through per-thread connections so concurrent lookups don't
+        # contend on the writer lock (WAL readers never block each other)
+        self._local = threading.local()
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        
+        # Cached (start, end) date range per (ticker, interval); invalidated on writes
+        self._date_range_cache: Dict[Tuple[str, str], Optional[Tuple[date, date]]] = {}
+        
         # Initialize database
         self._init_database()
         
         self.logger.info("CacheManager initialized with database: %s", self.cache_db_path)
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache database with tuned PRAGMAs applied."""
+        # Autocommit mode: transactions are managed explicitly via _transaction()
+        conn = sqlite3.connect(
+            self.cache_db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one explicit transaction on the shared connection."""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Return this thread's read connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._prune_readers()
+                self._readers[threading.current_thread()] = conn
+        return conn
+    
+    def _prune_readers(self):
+        """Close read connections whose threads have exited (e.g. finished pool workers)."""
+        with self._lock:
+            for thread in [thread for thread in self._readers if not thread.is_alive()]:
+                self._readers.pop(thread).close()
+    
+    def close(self):
+        """Close the underlying database connections."""
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._local = threading.local()
+            
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self.logger.info("CacheManager connection closed: %s", self.cache_db_path)
+    
     def _init_database(self):
         """Initialize the SQLite database with required tables."""
-        with sqlite3.connect(self.cache_db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS stock_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    interval TEXT NOT NULL,
-                    date DATE NOT NULL,
-                    open_price REAL NOT NULL,
-                    high_price REAL NOT NULL,
-                    low_price REAL NOT NULL,
-                    close_price REAL NOT NULL,
-                    volume INTEGER,
-                    cached_at DATETIME NOT NULL,
-                    UNIQUE(ticker, interval, date)
-                )
-            """)
+        with self._transaction() as conn:
+            conn.execute(_CREATE_STOCK_DATA_SQL.format(table="stock_data"))
             
-            # Create indexes for faster queries with proper date ordering
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_ticker_interval_date 
-                ON stock_data(ticker, interval, date DESC)
-            """)
+            # Databases created before the clustered layout still carry the
+            # surrogate id column; rebuild them once into the WITHOUT ROWID table
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(stock_data)")]
+            if 'id' in columns:
+                self._migrate_rowid_table(conn)
             
+            # cached_at used to be ISO8601 text; convert any remaining rows to
+            # Unix epoch seconds so comparisons can use idx_cached_at
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_ticker_interval 
-                ON stock_data(ticker, interval)
+                UPDATE stock_data
+                SET cached_at = CAST(strftime('%s', cached_at, 'utc') AS INTEGER)
+                WHERE typeof(cached_at) = 'text'
             """)
             
+            # The primary key already clusters rows by (ticker, interval, date),
+            # so any (ticker, interval) prefix lookup is served by it
+            conn.execute("DROP INDEX IF EXISTS idx_ticker_interval_date")
+            conn.execute("DROP INDEX IF EXISTS idx_ticker_interval")
+            
             # Create index for date range queries
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_date_range 
                 ON stock_data(date)
             """)
             
-            conn.commit()
+            # Create index for expiring old entries
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cached_at 
+                ON stock_data(cached_at)
+            """)
+    
+    def _migrate_rowid_table(self, conn: sqlite3.Connection):
+        """
+        Copy a legacy rowid-based stock_data table into the WITHOUT ROWID layout.
+        
+        Args:
+            conn (sqlite3.Connection): Connection with an open transaction
+        """
+        self.logger.info("Migrating cache table to WITHOUT ROWID layout: %s", self.cache_db_path)
+        
+        conn.execute(_CREATE_STOCK_DATA_SQL.format(table="stock_data_new"))
+        conn.execute("""
+            INSERT OR REPLACE INTO stock_data_new
+            (ticker, interval, date, open_price, high_price, low_price, close_price, volume, cached_at)
+            SELECT ticker, interval, date, open_price, high_price, low_price, close_price, volume, cached_at
+            FROM stock_data
+        """)
+        
+        # Dropping the old table also drops its indexes, which are recreated afterwards
+        conn.execute("DROP TABLE stock_data")
+        conn.execute("ALTER TABLE stock_data_new RENAME TO stock_data")
     
     def _dataframe_to_rows(self, df: pd.DataFrame) -> list:
         """
@@ -88,26 +299,26 @@ class CacheManager:
         Returns:
             list: List of tuples for database insertion
         """
-        rows = []
-        cached_at = datetime.now().isoformat()
+        cached_at = int(datetime.now().timestamp())
         
-        for date_idx, row in df.iterrows():
-            # Ensure proper ISO date format for SQLite DATE type
-            date_str = date_idx.strftime('%Y-%m-%d')
-            volume = int(row.get('Volume', 0)) if pd.notna(row.get('Volume', 0)) else None
-            
-            row_tuple = (
-                date_str,              # DATE format: YYYY-MM-DD
-                float(row['Open']),
-                float(row['High']),
-                float(row['Low']),
-                float(row['Close']),
-                volume,
-                cached_at             # DATETIME format: ISO8601
-            )
-            rows.append(row_tuple)
+        # Extract whole columns at once instead of materializing a Series per row;
+        # dates use proper ISO format for SQLite DATE type
+        dates = df.index.strftime('%Y-%m-%d').tolist()
+        opens, highs, lows, closes = (
+            df[col].astype('float64').tolist() for col in ('Open', 'High', 'Low', 'Close')
+        )
+        
+        if 'Volume' in df.columns:
+            volume = df['Volume']
+            if pd.api.types.is_float_dtype(volume):
+                # Fractional volumes are truncated like int() did; Int64 rejects them otherwise
+                volume = np.trunc(volume)
+            volumes = volume.astype('Int64').astype(object).where(volume.notna(), None).tolist()
+        else:
+            volumes = [0] * len(df)
         
-        return rows
+        # cached_at is stored as Unix epoch seconds
+        return list(zip(dates, opens, highs, lows, closes, volumes, repeat(cached_at)))
     
     def _rows_to_dataframe(self, rows: list) -> pd.DataFrame:
         """
@@ -122,26 +333,24 @@ class CacheManager:
         if not rows:
             return pd.DataFrame()
         
-        data = []
-        for row in rows:
-            date_str, open_price, high_price, low_price, close_price, volume, cached_at = row
-            
-            row_dict = {
-                'Open': open_price,
-                'High': high_price,
-                'Low': low_price,
-                'Close': close_price
-            }
-            
-            if volume is not None:
-                row_dict['Volume'] = volume
-            
-            data.append(row_dict)
+        # Transpose once into columns rather than building a dict per row
+        date_strs, opens, highs, lows, closes, volumes = zip(*rows)
+        
+        data = {
+            'Open': opens,
+            'High': highs,
+            'Low': lows,
+            'Close': closes
+        }
+        
+        # Volume is nullable; only keep the column if anything was stored
+        if any(volume is not None for volume in volumes):
+            data['Volume'] = volumes
         
-        df = pd.DataFrame(data)
-        df.index = pd.to_datetime([row[0] for row in rows])
+        # Dates are always stored as YYYY-MM-DD, so skip format inference
+        index = pd.to_datetime(date_strs, format='%Y-%m-%d', cache=True)
         
-        return df
+        return pd.DataFrame(data, index=index)
     
     def _get_cached_date_range(
         self, 
@@ -158,21 +367,36 @@ class CacheManager:
         Returns:
             Optional[Tuple[date, date]]: Start and end dates of cached data, or None
         """
-        with sqlite3.connect(self.cache_db_path) as conn:
-            cursor = conn.execute("""
-                SELECT MIN(date) as min_date, MAX(date) as max_date
-                FROM stock_data 
-                WHERE ticker = ? AND interval = ?
-            """, (ticker, interval))
+        key = (ticker, interval)
+        
+        if key in self._date_range_cache:
+            return self._date_range_cache[key]
+        
+        cursor = self._reader().execute(_SELECT_DATE_RANGE_SQL, key)
+        
+        row = cursor.fetchone()
+        cached_range = None
+        if row and row[0] and row[1]:
+            # SQLite stores dates as text in ISO format, parse them properly
+            start_date = date.fromisoformat(row[0])
+            end_date = date.fromisoformat(row[1])
+            cached_range = (start_date, end_date)
+        
+        self._date_range_cache[key] = cached_range
+        return cached_range
+    
+    def get_cached_date_range(self, ticker: str, interval: str) -> Optional[Tuple[date, date]]:
+        """
+        Get the first and last cached dates for a ticker/interval.
+        
+        Args:
+            ticker (str): Stock ticker
+            interval (str): Data interval
             
-            row = cursor.fetchone()
-            if row and row[0] and row[1]:
-                # SQLite stores dates as text in ISO format, parse them properly
-                start_date = datetime.strptime(row[0], '%Y-%m-%d').date()
-                end_date = datetime.strptime(row[1], '%Y-%m-%d').date()
-                return start_date, end_date
-        
-        return None
+        Returns:
+            Optional[Tuple[date, date]]: Start and end dates of cached data, or None
+        """
+        return self._get_cached_date_range(ticker, interval)
     
     def _check_data_coverage(
         self,
@@ -199,8 +423,10 @@ class CacheManager:
         
         cached_start, cached_end = cached_range
         
-        # Check if cached range covers requested range
-        covers_range = (cached_start <= requested_start and cached_end >= requested_end)
+        # Check if cached range covers requested range (the first bar may fall
+        # on the first trading day after the requested start)
+        covers_range = (cached_start <= covering_start_limit(requested_start, interval)
+                        and cached_end >= requested_end)
         
         if covers_range:
             self.logger.info("Cache covers requested range for %s %s: cached %s to %s, requested %s to %s", 
@@ -230,30 +456,52 @@ class CacheManager:
         Returns:
             Optional[pd.DataFrame]: Cached data covering the requested range, or None
         """
-        # Check if we have data covering the requested range
-        if not self._check_data_coverage(ticker, interval, requested_start, requested_end):
-            self.logger.info("No covering cache found for %s %s %s to %s", 
-                           ticker, interval, requested_start, requested_end)
-            return None
+        key = (ticker, interval)
+        
+        # Round the query window outward (start of month, end of week) so repeated
+        # requests with drifting dates bind identical parameters and reuse warm pages
+        query_start = requested_start.replace(day=1)
+        query_end = requested_end + timedelta(days=6 - requested_end.weekday())
         
-        # Query the specific date range from database using proper date comparison
-        with sqlite3.connect(self.cache_db_path) as conn:
-            cursor = conn.execute("""
-                SELECT date, open_price, high_price, low_price, close_price, volume, cached_at
-                FROM stock_data 
-                WHERE ticker = ? AND interval = ?
-                AND date >= DATE(?) AND date <= DATE(?)
-                ORDER BY date ASC
-            """, (ticker, interval, requested_start.isoformat(), requested_end.isoformat()))
+        # Query the rounded date range from database using proper date comparison;
+        # the WITHOUT ROWID primary key holds every column, so this is a single
+        # B-tree range scan with no per-row lookup
+        if key in self._date_range_cache:
+            # Coverage is already known, so a miss returns without touching SQLite
+            if not self._check_data_coverage(ticker, interval, requested_start, requested_end):
+                self.logger.info("No covering cache found for %s %s %s to %s", 
+                               ticker, interval, requested_start, requested_end)
+                return None
             
+            cursor = self._reader().execute(
+                _SELECT_RANGE_SQL,
+                (ticker, interval, query_start.isoformat(), query_end.isoformat())
+            )
+            rows = cursor.fetchall()
+        else:
+            cursor = self._reader().execute(
+                _SELECT_COVERED_RANGE_SQL,
+                (ticker, interval, query_start.isoformat(), query_end.isoformat(),
+                 covering_start_limit(requested_start, interval).isoformat(), requested_end.isoformat())
+            )
             rows = cursor.fetchall()
+            
+            if not rows:
+                self.logger.info("No covering cache found for %s %s %s to %s", 
+                               ticker, interval, requested_start, requested_end)
+                return None
+            
+            min_date, max_date = rows[0][6:]
+            self._date_range_cache[key] = (date.fromisoformat(min_date), date.fromisoformat(max_date))
+            rows = [row[:6] for row in rows]
         
         if not rows:
             self.logger.info("No cached data found for exact date range")
             return None
         
-        # Convert rows to DataFrame
+        # Convert rows to DataFrame and trim back to the exact requested range
         df = self._rows_to_dataframe(rows)
+        df = df.loc[pd.Timestamp(requested_start):pd.Timestamp(requested_end)]
         
         if len(df) > 0:
             self.logger.info("Returning %d rows of cached data for %s %s", 
@@ -263,6 +511,63 @@ class CacheManager:
             self.logger.info("Cached data exists but no rows match requested date range")
             return None
     
+    def get_recent_cached_data(
+        self,
+        ticker: str,
+        interval: str,
+        requested_start: date,
+        max_age: timedelta
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get cached data that was refreshed within max_age, even if it does not
+        reach the requested end date (weekends, holidays, before the close).
+        
+        Args:
+            ticker (str): Stock ticker
+            interval (str): Data interval ('1d', '1wk', '1mo')
+            requested_start (date): Start date requested
+            max_age (timedelta): Maximum age of the last refresh
+            
+        Returns:
+            Optional[pd.DataFrame]: Cached data from requested_start to the last
+            cached date, or None if it is missing or older than max_age
+        """
+        row = self._reader().execute(_SELECT_LAST_CACHED_AT_SQL, (ticker, interval)).fetchone()
+        if row is None or datetime.now().timestamp() - row[0] > max_age.total_seconds():
+            return None
+        
+        cached_range = self._get_cached_date_range(ticker, interval)
+        if not cached_range:
+            return None
+        
+        self.logger.info("Cache for %s %s was refreshed within %s", ticker, interval, max_age)
+        return self.get_cached_data(ticker, interval, requested_start, cached_range[1])
+    
+    def get_cached_data_many(
+        self,
+        requests: List[Tuple[str, str, date, date]],
+        max_workers: int = 8
+    ) -> Dict[Tuple[str, str, date, date], Optional[pd.DataFrame]]:
+        """
+        Get cached data for several requests concurrently.
+        
+        Args:
+            requests (List[Tuple[str, str, date, date]]): (ticker, interval, start, end) tuples
+            max_workers (int): Maximum number of reader threads
+            
+        Returns:
+            Dict[Tuple[str, str, date, date], Optional[pd.DataFrame]]: Cached data (or None) per request
+        """
+        if not requests:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            results = dict(zip(requests, executor.map(lambda request: self.get_cached_data(*request), requests)))
+        
+        # The pool's workers have exited, so release their read connections
+        self._prune_readers()
+        return results
+    
     def cache_data(
         self, 
         ticker: str, 
@@ -288,16 +593,18 @@ class CacheManager:
             # Convert DataFrame to rows for insertion
             rows = self._dataframe_to_rows(df)
             
-            with sqlite3.connect(self.cache_db_path) as conn:
-                # Use INSERT OR REPLACE to handle duplicates
-                for row in rows:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO stock_data 
-                        (ticker, interval, date, open_price, high_price, low_price, close_price, volume, cached_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (ticker, interval) + row)
-                
-                conn.commit()
+            params = [(ticker, interval) + row for row in rows]
+
+            with self._transaction() as conn:
+                # Insert all rows in a single explicit transaction, in multi-row
+                # batches; INSERT OR REPLACE handles duplicates
+                for offset in range(0, len(params), _INSERT_BATCH_SIZE):
+                    batch = params[offset:offset + _INSERT_BATCH_SIZE]
+                    conn.execute(
+                        _multi_row_insert_sql(len(batch)),
+                        [value for row in batch for value in row]
+                    )
+                self._date_range_cache.pop((ticker, interval), None)
                 
             self.logger.info("Cached %d rows for %s %s (%s to %s)", 
                            len(df), ticker, interval, start_date, end_date)
@@ -314,7 +621,7 @@ class CacheManager:
             interval (Optional[str]): If provided, only clear cache for this interval
         """
         try:
-            with sqlite3.connect(self.cache_db_path) as conn:
+            with self._transaction() as conn:
                 if ticker and interval:
                     conn.execute("DELETE FROM stock_data WHERE ticker = ? AND interval = ?", 
                                (ticker, interval))
@@ -329,7 +636,7 @@ class CacheManager:
                     conn.execute("DELETE FROM stock_data")
                     self.logger.info("Cleared all cache data")
                 
-                conn.commit()
+                self._date_range_cache.clear()
                 
         except Exception as e:
             self.logger.error("Failed to clear cache: %s", str(e))
@@ -342,20 +649,18 @@ class CacheManager:
             Dict[str, Any]: Cache statistics and information
         """
         try:
-            with sqlite3.connect(self.cache_db_path) as conn:
-                # Get total count
-                total_count = conn.execute("SELECT COUNT(*) FROM stock_data").fetchone()[0]
-                
-                # Get cache summary by ticker and interval
-                cursor = conn.execute("""
+            with self._lock:
+                # Get cache summary by ticker and interval in a single aggregation;
+                # the total count is the sum of the per-group counts
+                cursor = self._conn.execute("""
                     SELECT ticker, interval, 
                            MIN(date) as start_date, 
                            MAX(date) as end_date,
                            COUNT(*) as row_count,
-                           MAX(cached_at) as last_cached
+                           DATETIME(MAX(cached_at), 'unixepoch', 'localtime') as last_cached
                     FROM stock_data 
                     GROUP BY ticker, interval
-                    ORDER BY last_cached DESC
+                    ORDER BY MAX(cached_at) DESC
                 """)
                 
                 entries = []
@@ -372,6 +677,8 @@ class CacheManager:
                         'last_cached': last_cached
                     })
                 
+                total_count = sum(entry['row_count'] for entry in entries)
+                
                 # Get database file size
                 db_size = self.cache_db_path.stat().st_size if self.cache_db_path.exists() else 0
                 
@@ -400,20 +707,20 @@ class CacheManager:
             days_old (int): Remove entries older than this many days
         """
         try:
-            cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
+            cutoff = int((datetime.now() - timedelta(days=days_old)).timestamp())
             
-            with sqlite3.connect(self.cache_db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.execute("""
                     SELECT COUNT(*) FROM stock_data 
-                    WHERE DATETIME(cached_at) < DATETIME(?)
-                """, (cutoff_date,))
+                    WHERE cached_at < ?
+                """, (cutoff,))
                 old_count = cursor.fetchone()[0]
                 
                 conn.execute("""
                     DELETE FROM stock_data 
-                    WHERE DATETIME(cached_at) < DATETIME(?)
-                """, (cutoff_date,))
-                conn.commit()
+                    WHERE cached_at < ?
+                """, (cutoff,))
+                self._date_range_cache.clear()
                 
                 self.logger.info("Cleaned up %d old cache entries (older than %d days)", 
                                old_count, days_old)
@@ -6,11 +6,68 @@ with improved cache expiration logic based on data coverage.
 """
 
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, date
-from typing import Optional, Literal, Tuple
-from .cache_manager import CacheManager
+from typing import Dict, List, Optional, Literal, Tuple
+from .cache_manager import CacheManager, covering_start_limit
+
+
+# How long a refresh stays current when the cached data ends before today
+DEFAULT_CACHE_TTL = timedelta(days=1)
+
+# How far before the last cached bar an incremental fetch starts, so that a
+# few already-cached bars can be compared against freshly adjusted prices
+INCREMENTAL_OVERLAP = {
+    '1d': timedelta(days=7),
+    '1wk': timedelta(weeks=3),
+    '1mo': timedelta(days=93),
+}
+
+
+@lru_cache(maxsize=128)
+def _parse_period(period: str) -> pd.DateOffset:
+    """
+    Parse a period string into the calendar offset it covers.
+    
+    Args:
+        period (str): Period string like '10y', '5y', '1y', '6mo', '30d'
+        
+    Returns:
+        pd.DateOffset: Calendar-accurate offset to subtract from today
+        
+    Raises:
+        ValueError: If the period format is not supported
+    """
+    if period.endswith('y'):
+        return pd.DateOffset(years=int(period[:-1]))
+    if period.endswith('mo'):
+        return pd.DateOffset(months=int(period[:-2]))
+    if period.endswith('d'):
+        return pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period format: {period}")
+
+
+def _calculate_date_range(period: str) -> Tuple[date, date]:
+    """
+    Calculate the actual date range for a given period, ending today.
+    
+    Years and months are calendar-accurate (leap days and month lengths
+    included), matching how Yahoo interprets the same period string.
+    
+    Args:
+        period (str): Period string like '10y', '5y', '1y', '6mo'
+        
+    Returns:
+        Tuple[date, date]: Start and end dates
+    """
+    end_date = date.today()
+    return (pd.Timestamp(end_date) - _parse_period(period)).date(), end_date
 
 
 class DataFetcher:
@@ -21,8 +78,14 @@ class DataFetcher:
     caching operations to the CacheManager.
     """
     
-    def __init__(self):
-        """Initialize the data fetcher."""
+    def __init__(self, timeout: float = 10):
+        """
+        Initialize the data fetcher.
+        
+        Args:
+            timeout (float): Timeout in seconds for each API request
+        """
+        self.timeout = timeout
         self.logger = logging.getLogger(__name__)
         self.logger.info("DataFetcher initialized")
     
@@ -57,34 +120,56 @@ class DataFetcher:
         
         return ticker, period, interval
     
-    def _calculate_date_range(self, period: str) -> Tuple[date, date]:
+    def _clean_ohlc(self, data: pd.DataFrame, ticker: str) -> pd.DataFrame:
         """
-        Calculate the actual date range for a given period.
+        Reduce raw API data to clean numeric OHLC (and Volume) columns.
         
         Args:
-            period (str): Period string like '10y', '5y', '1y', '6mo'
+            data (pd.DataFrame): Raw data for one ticker
+            ticker (str): Stock ticker symbol (for error messages)
             
         Returns:
-            Tuple[date, date]: Start and end dates
+            pd.DataFrame: Data with OHLC columns and Volume if available
+            
+        Raises:
+            ValueError: If the data is empty or lacks OHLC columns
         """
-        end_date = date.today()
-        
-        # Parse period string
-        if period.endswith('y'):
-            years = int(period[:-1])
-            start_date = end_date - timedelta(days=years * 365)
-        elif period.endswith('mo'):
-            months = int(period[:-2])
-            start_date = end_date - timedelta(days=months * 30)
-        elif period.endswith('d'):
-            days = int(period[:-1])
-            start_date = end_date - timedelta(days=days)
-        else:
-            raise ValueError(f"Unsupported period format: {period}")
-        
-        return start_date, end_date
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}")
+        
+        # Ensure we have the required OHLC columns
+        required_columns = ['Open', 'High', 'Low', 'Close']
+        missing_columns = [col for col in required_columns if col not in data.columns]
+        
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {missing_columns}")
+        
+        # Keep only OHLC columns and Volume if available
+        columns_to_keep = ['Open', 'High', 'Low', 'Close']
+        if 'Volume' in data.columns:
+            columns_to_keep.append('Volume')
+        
+        data = data[columns_to_keep]
+        
+        # yfinance already returns numeric columns; only coerce the ones
+        # that came back with a non-numeric dtype
+        for col in data.columns:
+            if not pd.api.types.is_numeric_dtype(data[col]):
+                data[col] = pd.to_numeric(data[col], errors='coerce')
+        
+        # Remove any rows with NaN values (including failed conversions): one
+        # NaN scan over the float block, and no new frame when nothing is dropped
+        valid = ~np.isnan(data.to_numpy(dtype=np.float64)).any(axis=1)
+        if not valid.all():
+            data = data[valid]
+        
+        if data.empty:
+            raise ValueError(f"No valid data found for ticker {ticker} after cleaning")
+        
+        return data
     
-    def fetch_from_api(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+    def fetch_from_api(self, ticker: str, period: str, interval: str,
+                       start: Optional[date] = None) -> pd.DataFrame:
         """
         Fetch data directly from Yahoo Finance API.
         
@@ -92,6 +177,8 @@ class DataFetcher:
             ticker (str): Stock ticker symbol
             period (str): Time period
             interval (str): Data interval
+            start (Optional[date]): If provided, fetch from this date to today
+                instead of the whole period
             
         Returns:
             pd.DataFrame: Stock data with OHLC columns
@@ -102,44 +189,22 @@ class DataFetcher:
         ticker, period, interval = self._validate_parameters(ticker, period, interval)
         
         try:
-            self.logger.info("Fetching data from API for %s with period=%s, interval=%s", 
-                           ticker, period, interval)
-            
             # Create yfinance Ticker object
             stock = yf.Ticker(ticker)
             
             # Fetch historical data
-            data = stock.history(period=period, interval=interval, auto_adjust=True, prepost=True)
-            
-            if data.empty:
-                raise ValueError(f"No data found for ticker {ticker}")
-            
-            # Ensure we have the required OHLC columns
-            required_columns = ['Open', 'High', 'Low', 'Close']
-            missing_columns = [col for col in required_columns if col not in data.columns]
-            
-            if missing_columns:
-                raise ValueError(f"Missing required columns: {missing_columns}")
+            if start is not None:
+                self.logger.info("Fetching data from API for %s from %s, interval=%s",
+                               ticker, start, interval)
+                data = stock.history(start=start.isoformat(), interval=interval, auto_adjust=True,
+                                     prepost=True, timeout=self.timeout)
+            else:
+                self.logger.info("Fetching data from API for %s with period=%s, interval=%s", 
+                               ticker, period, interval)
+                data = stock.history(period=period, interval=interval, auto_adjust=True, prepost=True,
+                                     timeout=self.timeout)
             
-            # Keep only OHLC columns and Volume if available
-            columns_to_keep = ['Open', 'High', 'Low', 'Close']
-            if 'Volume' in data.columns:
-                columns_to_keep.append('Volume')
-            
-            data = data[columns_to_keep].copy()
-            
-            # Remove any rows with NaN values
-            data = data.dropna()
-            
-            # Ensure numeric types
-            for col in data.columns:
-                data[col] = pd.to_numeric(data[col], errors='coerce')
-            
-            # Drop any rows that became NaN after conversion
-            data = data.dropna()
-            
-            if data.empty:
-                raise ValueError(f"No valid data found for ticker {ticker} after cleaning")
+            data = self._clean_ohlc(data, ticker)
             
             self.logger.info("Successfully fetched %d rows of data for %s", len(data), ticker)
             return data
@@ -148,6 +213,56 @@ class DataFetcher:
             error_msg = f"Failed to fetch data for {ticker}: {str(e)}"
             self.logger.error(error_msg)
             raise Exception(error_msg)
+    
+    def fetch_batch_from_api(self, tickers: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch data for several tickers from Yahoo Finance in one download call.
+        
+        Args:
+            tickers (List[str]): Stock ticker symbols
+            period (str): Time period
+            interval (str): Data interval
+            
+        Returns:
+            Dict[str, pd.DataFrame]: Data per ticker; tickers with no usable
+            data are logged and left out
+            
+        Raises:
+            Exception: If the download call itself fails
+        """
+        validated = [self._validate_parameters(ticker, period, interval)[0] for ticker in tickers]
+        tickers = list(dict.fromkeys(validated))
+        if not tickers:
+            return {}
+        
+        try:
+            self.logger.info("Fetching batch data from API for %d tickers with period=%s, interval=%s",
+                           len(tickers), period, interval)
+            
+            raw = yf.download(tickers, period=period, interval=interval, auto_adjust=True, prepost=True,
+                              group_by='ticker', threads=True, progress=False, timeout=self.timeout)
+        except Exception as e:
+            error_msg = f"Failed to fetch batch data for {', '.join(tickers)}: {str(e)}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+        
+        results = {}
+        if raw is None or raw.empty:
+            self.logger.warning("Batch download returned no data for %s", ', '.join(tickers))
+            return results
+        
+        has_ticker_level = isinstance(raw.columns, pd.MultiIndex)
+        for ticker in tickers:
+            if has_ticker_level and ticker not in raw.columns.get_level_values(0):
+                self.logger.warning("No data found for ticker %s in batch download", ticker)
+                continue
+            try:
+                results[ticker] = self._clean_ohlc(raw[ticker] if has_ticker_level else raw, ticker)
+            except ValueError as e:
+                self.logger.warning("Skipping %s in batch download: %s", ticker, str(e))
+        
+        self.logger.info("Successfully fetched batch data for %d of %d tickers", len(results), len(tickers))
+        return results
 
 
 class StockDataService:
@@ -158,16 +273,28 @@ class StockDataService:
     using the DataFetcher for API calls and CacheManager for caching.
     """
     
-    def __init__(self, cache_db_path: str = "ticker_data/stock_cache.db"):
+    def __init__(self, cache_db_path: str = "ticker_data/stock_cache.db", memory_cache_size: int = 256,
+                 request_timeout: float = 10, cache_ttl: Optional[timedelta] = DEFAULT_CACHE_TTL):
         """
         Initialize the stock data service.
         
         Args:
             cache_db_path (str): Path to cache database
+            memory_cache_size (int): Maximum number of results kept in the in-process LRU cache
+            request_timeout (float): Timeout in seconds for each API request
+            cache_ttl (Optional[timedelta]): Cached data refreshed within this long is
+                reused even if it stops short of today; None requires full coverage
         """
-        self.data_fetcher = DataFetcher()
+        self.cache_ttl = cache_ttl
+        self.data_fetcher = DataFetcher(timeout=request_timeout)
         self.cache_manager = CacheManager(cache_db_path)
         
+        # In-process LRU over get_stock_data results, keyed by
+        # (ticker, period, interval, end_date) so entries expire with the day
+        self._memory_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self._memory_cache_size = memory_cache_size
+        self._memory_cache_lock = threading.Lock()
+        
         # Set up logging
         logging.basicConfig(
             level=logging.INFO,
@@ -177,33 +304,6 @@ class StockDataService:
         
         self.logger.info("StockDataService initialized")
     
-    def _calculate_date_range(self, period: str) -> Tuple[date, date]:
-        """
-        Calculate the actual date range for a given period.
-        
-        Args:
-            period (str): Period string like '10y', '5y', '1y', '6mo'
-            
-        Returns:
-            Tuple[date, date]: Start and end dates
-        """
-        end_date = date.today()
-        
-        # Parse period string
-        if period.endswith('y'):
-            years = int(period[:-1])
-            start_date = end_date - timedelta(days=years * 365)
-        elif period.endswith('mo'):
-            months = int(period[:-2])
-            start_date = end_date - timedelta(days=months * 30)
-        elif period.endswith('d'):
-            days = int(period[:-1])
-            start_date = end_date - timedelta(days=days)
-        else:
-            raise ValueError(f"Unsupported period format: {period}")
-        
-        return start_date, end_date
-    
     def get_stock_data(
         self, 
         ticker: str,
@@ -231,33 +331,28 @@ class StockDataService:
         ticker, period, interval = self.data_fetcher._validate_parameters(ticker, period, interval)
         
         # Calculate the actual date range we need
-        start_date, end_date = self._calculate_date_range(period)
+        start_date, end_date = _calculate_date_range(period)
         
         self.logger.info("Requesting %s %s data from %s to %s", 
                         ticker, interval, start_date, end_date)
         
         # Check cache first (unless force refresh)
         if not force_refresh:
-            cached_data = self.cache_manager.get_cached_data(ticker, interval, start_date, end_date)
+            cached_data = self._lookup_cache(ticker, period, interval, start_date, end_date)
             if cached_data is not None:
-                self.logger.info("Returning cached data with %d rows", len(cached_data))
                 return cached_data
         
-        # Fetch fresh data from API
+        # Fetch fresh data from API: only the new bars when the cache can be
+        # extended, otherwise the whole period
         try:
-            fresh_data = self.data_fetcher.fetch_from_api(ticker, period, interval)
-            
-            # Cache the fresh data
-            self.cache_manager.cache_data(ticker, interval, fresh_data)
-            
-            # Filter to exact requested range (in case API returned more data)
-            filtered_data = fresh_data[
-                (fresh_data.index.date >= start_date) & 
-                (fresh_data.index.date <= end_date)
-            ].copy()
+            if not force_refresh:
+                updated_data = self._fetch_incremental(ticker, period, interval, start_date)
+                if updated_data is not None:
+                    self.logger.info("Returning incrementally updated data with %d rows", len(updated_data))
+                    return self._store_memory_cached((ticker, period, interval, end_date), updated_data)
             
-            self.logger.info("Returning fresh data with %d rows", len(filtered_data))
-            return filtered_data
+            fresh_data = self.data_fetcher.fetch_from_api(ticker, period, interval)
+            return self._store_fresh(ticker, period, interval, fresh_data, start_date, end_date)
             
         except Exception as e:
             # If fresh fetch fails, try to use any available cached data
@@ -270,6 +365,203 @@ class StockDataService:
             # If all else fails, re-raise the exception
             raise e
     
+    def _fetch_incremental(self, ticker: str, period: str, interval: str,
+                           start_date: date) -> Optional[pd.DataFrame]:
+        """
+        Extend the cached data with the bars published since it was last fetched.
+        
+        A few already-cached bars are fetched again as an overlap. If their
+        adjusted closes no longer match (a dividend or split re-adjusted the
+        history), the cache cannot simply be extended and None is returned.
+        
+        Args:
+            ticker (str): Validated stock ticker symbol
+            period (str): Time period
+            interval (str): Data interval
+            start_date (date): Start of the requested range
+            
+        Returns:
+            Optional[pd.DataFrame]: Data from start_date to the newest bar, or None
+            if a full fetch is needed
+        """
+        cached_range = self.cache_manager.get_cached_date_range(ticker, interval)
+        if not cached_range or cached_range[0] > covering_start_limit(start_date, interval):
+            return None
+        
+        cached_end = cached_range[1]
+        overlap_start = cached_end - INCREMENTAL_OVERLAP[interval]
+        new_data = self.data_fetcher.fetch_from_api(ticker, period, interval, start=overlap_start)
+        cached_overlap = self.cache_manager.get_cached_data(ticker, interval, overlap_start, cached_end)
+        if cached_overlap is None:
+            return None
+        
+        # The newest cached bar may have been partial, so only older bars must match
+        old_close = pd.Series(cached_overlap['Close'].to_numpy(), index=cached_overlap.index.strftime('%Y-%m-%d'))
+        new_close = pd.Series(new_data['Close'].to_numpy(), index=new_data.index.strftime('%Y-%m-%d'))
+        common = old_close.index[:-1].intersection(new_close.index)
+        if common.empty or not np.allclose(old_close[common], new_close[common], rtol=1e-6):
+            self.logger.info("Cached history of %s %s was re-adjusted, refetching the full period",
+                           ticker, interval)
+            return None
+        
+        self.cache_manager.cache_data(ticker, interval, new_data)
+        return self.cache_manager.get_cached_data(ticker, interval, start_date, new_data.index[-1].date())
+    
+    def _lookup_cache(self, ticker: str, period: str, interval: str,
+                      start_date: date, end_date: date) -> Optional[pd.DataFrame]:
+        """
+        Look up a request in the in-memory cache, then in SQLite.
+        
+        Args:
+            ticker (str): Validated stock ticker symbol
+            period (str): Time period
+            interval (str): Data interval
+            start_date (date): Start of the requested range
+            end_date (date): End of the requested range
+            
+        Returns:
+            Optional[pd.DataFrame]: Cached data, or None on a miss
+        """
+        memory_key = (ticker, period, interval, end_date)
+        cached_data = self._get_memory_cached(memory_key)
+        if cached_data is not None:
+            self.logger.info("Returning in-memory cached data with %d rows", len(cached_data))
+            return cached_data
+        
+        cached_data = self.cache_manager.get_cached_data(ticker, interval, start_date, end_date)
+        if cached_data is None and self.cache_ttl:
+            # No bars up to today yet (weekend, holiday, before the close) but
+            # the data was refreshed recently, so a new download would not help
+            cached_data = self.cache_manager.get_recent_cached_data(ticker, interval, start_date, self.cache_ttl)
+        if cached_data is not None:
+            self.logger.info("Returning cached data with %d rows", len(cached_data))
+            return self._store_memory_cached(memory_key, cached_data)
+        return None
+    
+    def _store_fresh(self, ticker: str, period: str, interval: str, fresh_data: pd.DataFrame,
+                     start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Cache freshly fetched data and return it trimmed to the requested range.
+        
+        Args:
+            ticker (str): Validated stock ticker symbol
+            period (str): Time period
+            interval (str): Data interval
+            fresh_data (pd.DataFrame): Data returned by the API
+            start_date (date): Start of the requested range
+            end_date (date): End of the requested range
+            
+        Returns:
+            pd.DataFrame: Fresh data within the requested range
+        """
+        # Cache the fresh data
+        self.cache_manager.cache_data(ticker, interval, fresh_data)
+        
+        # Filter to exact requested range (in case API returned more data);
+        # date-string slicing binary-searches the sorted DatetimeIndex and
+        # works whether or not the index is timezone-aware. fresh_data is
+        # local to this call, so the slice is returned without a copy.
+        filtered_data = fresh_data.loc[start_date.isoformat():end_date.isoformat()]
+        
+        self.logger.info("Returning fresh data for %s with %d rows", ticker, len(filtered_data))
+        return self._store_memory_cached((ticker, period, interval, end_date), filtered_data)
+    
+    def _get_memory_cached(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """Return a shallow copy of an in-memory cached result, or None on a miss."""
+        with self._memory_cache_lock:
+            cached = self._memory_cache.get(key)
+            if cached is None:
+                return None
+            self._memory_cache.move_to_end(key)
+        return cached.copy(deep=False)
+    
+    def _store_memory_cached(self, key: Tuple, df: pd.DataFrame) -> pd.DataFrame:
+        """Store a result in the in-memory LRU cache and return a shallow copy of it."""
+        with self._memory_cache_lock:
+            self._memory_cache[key] = df
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self._memory_cache_size:
+                self._memory_cache.popitem(last=False)
+        return df.copy(deep=False)
+    
+    def _clear_memory_cache(self):
+        """Drop all in-memory cached results."""
+        with self._memory_cache_lock:
+            self._memory_cache.clear()
+    
+    def get_stock_data_batch(
+        self,
+        tickers: List[str],
+        period: str = "10y",
+        interval: Literal['1d', '1wk', '1mo'] = '1d',
+        max_workers: int = 8
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get stock data for several tickers.
+        
+        Cache hits are served locally; all misses are fetched together with a
+        single multi-ticker download. Tickers the batch download could not
+        provide are retried one by one through get_stock_data in a thread pool
+        (which also falls back to any stale cached data).
+        
+        Args:
+            tickers (List[str]): Stock ticker symbols
+            period (str): Time period to fetch (e.g., '10y', '5y', '1y')
+            interval (Literal['1d', '1wk', '1mo']): Data granularity
+            max_workers (int): Maximum number of concurrent per-ticker retries
+            
+        Returns:
+            Dict[str, pd.DataFrame]: Data per ticker, in input order; tickers
+            whose fetch failed are logged and left out
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        start_date, end_date = _calculate_date_range(period)
+        
+        # Serve what the caches already hold; only misses go to the API
+        results: Dict[str, Optional[pd.DataFrame]] = {}
+        misses: Dict[str, str] = {}
+        for ticker in tickers:
+            try:
+                symbol = self.data_fetcher._validate_parameters(ticker, period, interval)[0]
+            except ValueError as e:
+                self.logger.error("Failed to get data for %s: %s", ticker, str(e))
+                results[ticker] = None
+                continue
+            results[ticker] = self._lookup_cache(symbol, period, interval, start_date, end_date)
+            if results[ticker] is None:
+                misses[ticker] = symbol
+        
+        if misses:
+            try:
+                fetched = self.data_fetcher.fetch_batch_from_api(list(misses.values()), period, interval)
+            except Exception as e:
+                self.logger.warning("Batch fetch failed, fetching tickers individually: %s", str(e))
+                fetched = {}
+            
+            retry = []
+            for ticker, symbol in misses.items():
+                if symbol in fetched:
+                    results[ticker] = self._store_fresh(symbol, period, interval, fetched[symbol],
+                                                        start_date, end_date)
+                else:
+                    retry.append(ticker)
+            
+            if retry:
+                def fetch(ticker: str) -> Optional[pd.DataFrame]:
+                    try:
+                        return self.get_stock_data(ticker, period, interval)
+                    except Exception as e:
+                        self.logger.error("Failed to get data for %s: %s", ticker, str(e))
+                        return None
+                
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(retry))) as executor:
+                    results.update(zip(retry, executor.map(fetch, retry)))
+        
+        return {ticker: data for ticker, data in results.items() if data is not None}
+    
     def clear_cache(self, ticker: Optional[str] = None, interval: Optional[str] = None):
         """
         Clear cached data.
@@ -279,6 +571,7 @@ class StockDataService:
             interval (Optional[str]): If provided, only clear cache for this interval
         """
         self.cache_manager.clear_cache(ticker, interval)
+        self._clear_memory_cache()
     
     def get_cache_info(self) -> dict:
         """
@@ -297,6 +590,7 @@ class StockDataService:
             days_old (int): Remove entries older than this many days
         """
         self.cache_manager.cleanup_old_cache(days_old)
+        self._clear_memory_cache()
 
 
 # Convenience function for quick usage
@@ -318,25 +612,3 @@ def get_stock_data(
     """
     service = StockDataService()
     return service.get_stock_data(ticker, period, interval)
-
-
-if __name__ == "__main__":
-    # Example usage
-    service = StockDataService()
-    
-    print("Fetching Apple daily data for the last 1 year...")
-    try:
-        aapl_data = service.get_stock_data('AAPL', period='1y')
-        print(f"Retrieved {len(aapl_data)} rows of data")
-        print("Columns:", list(aapl_data.columns))
-        print("\nFirst 5 rows:")
-        print(aapl_data.head())
-        print("\nLast 5 rows:")
-        print(aapl_data.tail())
-        
-        print("\nCache info:")
-        cache_info = service.get_cache_info()
-        print(f"Total cache entries: {cache_info['total_entries']}")
-        
-    except Exception as e:
-        print(f"Error: {e}")
@@ -9,9 +9,44 @@ This file demonstrates the improved architecture with separated concerns:
 
 from .data_fetcher import StockDataService, get_stock_data
 from .cache_manager import CacheManager
+import argparse
+import numpy as np
 import pandas as pd
 import time
-import yfinance as yf
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean via a cumulative sum; NaN until the window fills."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        csum = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _compute_indicators(close: np.ndarray, w1: int = 20, w2: int = 50):
+    """
+    Compute the basic technical indicators straight from the close prices.
+    
+    Args:
+        close (np.ndarray): Close prices
+        w1 (int): Short window for SMA and volatility
+        w2 (int): Long window for SMA
+        
+    Returns:
+        tuple: (daily_return, sma_w1, sma_w2, volatility_w1) as float64 arrays
+    """
+    close = np.asarray(close, dtype=np.float64)
+    ret = np.full(len(close), np.nan)
+    ret[1:] = close[1:] / close[:-1] - 1
+    
+    vol = np.full(len(close), np.nan)
+    # The first return is NaN, so the first full volatility window ends at index w1
+    if len(close) > w1:
+        vol[w1:] = sliding_window_view(ret[1:], w1).std(axis=1, ddof=1)
+    
+    return ret, _rolling_mean(close, w1), _rolling_mean(close, w2), vol
 
 
 def test_basic_functionality():
@@ -175,10 +210,11 @@ def test_data_analysis_ready():
         print(f"Data types:\n{data.dtypes}\n")
         
         # Add some basic technical indicators
-        data['Daily_Return'] = data['Close'].pct_change()
-        data['SMA_20'] = data['Close'].rolling(window=20).mean()
-        data['SMA_50'] = data['Close'].rolling(window=50).mean()
-        data['Volatility_20'] = data['Daily_Return'].rolling(window=20).std()
+        ret, sma20, sma50, vol20 = _compute_indicators(data['Close'].to_numpy())
+        data['Daily_Return'] = ret
+        data['SMA_20'] = sma20
+        data['SMA_50'] = sma50
+        data['Volatility_20'] = vol20
         
         print("Added technical indicators:")
         print("- Daily returns")
@@ -200,7 +236,15 @@ def test_data_analysis_ready():
 
 
 def main():
-    """Run all test examples."""
+    """Run all test examples (only with --demo, since they clear the cache and hit the network)."""
+    parser = argparse.ArgumentParser(description="Stock Data Service V2 usage examples")
+    parser.add_argument('--demo', action='store_true',
+                        help='clear the cache and run the live data-fetching examples')
+    args = parser.parse_args()
+    if not args.demo:
+        parser.print_help()
+        return
+    
     print("Stock Data Service V2 - Comprehensive Testing\n")
     print("=" * 60)
     
@@ -12,28 +12,48 @@ Usage:
 
 import argparse
 import sys
+from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from data_fetching import StockDataService
-from data_analysis import ReturnsAnalyzer
+# data_fetching/data_analysis（pandas、yfinance等）在各命令函数内按需导入，
+# --help 等不需要它们的调用无需承担导入开销
 
 
-def fetch_data(ticker: str, period: str = '10y', interval: str = '1d'):
-    """获取股票数据"""
+def _normalize(ticker: str) -> str:
+    """把指数简称转换为Yahoo代码，其他ticker原样返回（别名表与分析器共用）"""
+    from data_analysis.analyzers.base_analyzer import _TICKER_ALIASES
+    return _TICKER_ALIASES.get(ticker.upper(), ticker)
+
+
+@lru_cache(maxsize=1)
+def _get_analyzer():
+    """进程内共享的收益率分析器（数据库连接等只初始化一次）"""
+    from data_analysis import ReturnsAnalyzer
+    return ReturnsAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def _get_service(request_timeout: float = 10, cache_ttl_hours: float = 24):
+    """进程内共享的数据服务（相同配置复用同一实例及其内存缓存）"""
+    from data_fetching import StockDataService
+    return StockDataService(request_timeout=request_timeout,
+                            cache_ttl=timedelta(hours=cache_ttl_hours) if cache_ttl_hours > 0 else None)
+
+
+def fetch_data(ticker: str, period: str = '10y', interval: str = '1d',
+               use_cache: bool = True, cache_ttl_hours: float = 24):
+    """获取股票数据（缓存在cache_ttl_hours小时内刷新过则不再下载）"""
     print(f"🚀 开始获取 {ticker} 数据...")
     
     try:
-        service = StockDataService()
-        
-        # 转换ticker格式
-        if ticker.upper() == 'SPX':
-            ticker = '^GSPC'
+        service = _get_service(cache_ttl_hours=cache_ttl_hours)
         
-        data = service.get_stock_data(ticker, period=period, interval=interval)
+        data = service.get_stock_data(ticker, period=period, interval=interval, force_refresh=not use_cache)
         
         if data is not None:
             print(f"✅ 成功获取 {ticker} 数据：{len(data)} 条记录")
@@ -53,11 +73,7 @@ def analyze_returns(ticker: str):
     print(f"📊 开始分析 {ticker} 收益率...")
     
     try:
-        analyzer = ReturnsAnalyzer()
-        
-        # 转换ticker格式
-        if ticker.upper() == 'SPX':
-            ticker = '^GSPC'
+        analyzer = _get_analyzer()
         
         # 分析日收益率
         daily_results = analyzer.analyze_daily_returns(ticker, create_plots=True)
@@ -89,11 +105,7 @@ def analyze_intraday_returns(ticker: str):
     print(f"   分类方式: 高开(>0) | 低开(<0) | 平开(=0)")
     
     try:
-        analyzer = ReturnsAnalyzer()
-        
-        # 转换ticker格式
-        if ticker.upper() == 'SPX':
-            ticker = '^GSPC'
+        analyzer = _get_analyzer()
         
         # 分析日内收益率
         intraday_results = analyzer.analyze_intraday_returns(ticker, create_plots=True)
@@ -116,11 +128,7 @@ def analyze_daily_range(ticker: str):
     print(f"   分析内容: 【昨收起点】昨收→高低点 & 【今开起点】今开→高低点")
     
     try:
-        analyzer = ReturnsAnalyzer()
-        
-        # 转换ticker格式
-        if ticker.upper() == 'SPX':
-            ticker = '^GSPC'
+        analyzer = _get_analyzer()
         
         # 分析日内波动范围
         range_results = analyzer.analyze_daily_range(ticker, create_plots=True)
@@ -137,22 +145,21 @@ def analyze_daily_range(ticker: str):
         return False
 
 
-def compare_stocks(tickers: list):
-    """比较多个股票的收益率"""
+def compare_stocks(tickers: list, prefetch: bool = False, workers: int = 8, timeout: float = 10):
+    """比较多个股票的收益率（默认只使用数据库中已有的数据，prefetch=True时先并行预取日线数据）"""
     print(f"📈 开始比较股票收益率: {', '.join(tickers)}")
     
     try:
-        analyzer = ReturnsAnalyzer()
-        
-        # 转换ticker格式
-        converted_tickers = []
-        for ticker in tickers:
-            if ticker.upper() == 'SPX':
-                converted_tickers.append('^GSPC')
-            else:
-                converted_tickers.append(ticker)
+        if prefetch:
+            # 预取数据：缓存已覆盖的股票直接命中本地，其余并行下载，网络等待相互重叠
+            service = _get_service(request_timeout=timeout)
+            prefetched = service.get_stock_data_batch(tickers, max_workers=workers)
+            for ticker in tickers:
+                if ticker not in prefetched:
+                    print(f"⚠️  预取 {ticker} 数据失败，将使用数据库中已有的数据")
         
-        results = analyzer.compare_returns(converted_tickers, create_plots=True)
+        analyzer = _get_analyzer()
+        results = analyzer.compare_returns(tickers, create_plots=True)
         
         if results:
             print(f"✅ 股票对比分析完成")
@@ -169,14 +176,46 @@ def compare_stocks(tickers: list):
 def show_available_data():
     """显示数据库中可用的数据"""
     try:
-        analyzer = ReturnsAnalyzer()
+        analyzer = _get_analyzer()
         analyzer.get_available_data()
     except Exception as e:
         print(f"❌ 查看可用数据时出错: {e}")
 
 
-def main():
-    """主函数"""
+def _print_fetch_hint(tickers: list):
+    """提示先获取数据"""
+    print(f"\n💡 提示: 可能需要先获取数据:")
+    for ticker in tickers:
+        print(f"   python3 main.py fetch {ticker}")
+
+
+def _run_fetch(args):
+    """fetch命令"""
+    if fetch_data(args.ticker, args.period, args.interval,
+                  use_cache=not args.no_cache, cache_ttl_hours=args.cache_ttl):
+        print(f"\n💡 提示: 现在可以运行分析命令:")
+        print(f"   python3 main.py analyze {args.ticker}")
+
+
+def _run_analysis(args):
+    """analyze/intraday/range命令（分析函数由子命令通过set_defaults指定）"""
+    if not args.analysis(args.ticker):
+        _print_fetch_hint([args.ticker])
+
+
+def _run_compare(args):
+    """compare命令"""
+    if not compare_stocks(args.tickers, args.prefetch, args.workers, args.timeout):
+        _print_fetch_hint(args.tickers)
+
+
+def _run_list(args):
+    """list命令"""
+    show_available_data()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(
         description='Stock Analysis Platform - 股票分析平台',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -188,6 +227,7 @@ def main():
   python3 main.py intraday SPX        # 分析SPX日内涨跌幅（高开/低开/平开）
   python3 main.py range SPX           # 分析SPX日内波动范围（双起点：昨收&今开）
   python3 main.py compare AAPL GOOGL MSFT  # 比较多个股票
+  python3 main.py compare AAPL MSFT --prefetch  # 先联网更新数据再比较
   python3 main.py list               # 查看可用数据
         """
     )
@@ -201,29 +241,57 @@ def main():
                              help='数据期间 (默认: 10y)')
     fetch_parser.add_argument('--interval', default='1d', 
                              help='数据间隔 (默认: 1d)')
+    fetch_parser.add_argument('--no-cache', action='store_true',
+                             help='忽略缓存，强制重新下载')
+    fetch_parser.add_argument('--cache-ttl', type=float, default=24,
+                             help='缓存在多少小时内刷新过即直接使用 (默认: 24，0表示要求覆盖到今天)')
+    fetch_parser.set_defaults(func=_run_fetch)
     
     # analyze命令
     analyze_parser = subparsers.add_parser('analyze', help='分析股票收益率')
     analyze_parser.add_argument('ticker', help='股票代码 (如: AAPL, SPX)')
+    analyze_parser.set_defaults(func=_run_analysis, analysis=analyze_returns)
     
     # intraday命令
     intraday_parser = subparsers.add_parser('intraday', help='分析股票日内涨跌幅（开盘到收盘）')
     intraday_parser.add_argument('ticker', help='股票代码 (如: AAPL, SPX)')
+    intraday_parser.set_defaults(func=_run_analysis, analysis=analyze_intraday_returns)
     
     # range命令
     range_parser = subparsers.add_parser('range', help='分析股票日内波动范围（双起点：昨收&今开）')
     range_parser.add_argument('ticker', help='股票代码 (如: AAPL, SPX)')
+    range_parser.set_defaults(func=_run_analysis, analysis=analyze_daily_range)
     
     # compare命令
     compare_parser = subparsers.add_parser('compare', help='比较多个股票')
     compare_parser.add_argument('tickers', nargs='+', 
                                help='股票代码列表 (如: AAPL GOOGL MSFT)')
+    compare_parser.add_argument('--prefetch', action='store_true',
+                               help='比较前先联网获取/更新数据（默认只使用数据库中已有的数据）')
+    compare_parser.add_argument('--workers', type=int, default=8,
+                               help='--prefetch时并行预取数据的线程数 (默认: 8)')
+    compare_parser.add_argument('--timeout', type=float, default=10,
+                               help='--prefetch时单次数据请求超时秒数 (默认: 10)')
+    compare_parser.set_defaults(func=_run_compare)
     
     # list命令
     list_parser = subparsers.add_parser('list', help='查看可用数据')
+    list_parser.set_defaults(func=_run_list)
     
+    return parser
+
+
+def main():
+    """主函数"""
+    parser = build_parser()
     args = parser.parse_args()
     
+    # 在命令行入口统一转换ticker格式，之后各命令函数只处理规范代码
+    if getattr(args, 'ticker', None):
+        args.ticker = _normalize(args.ticker)
+    if getattr(args, 'tickers', None):
+        args.tickers = [_normalize(ticker) for ticker in args.tickers]
+    
     if args.command is None:
         parser.print_help()
         return
@@ -232,39 +300,8 @@ def main():
     print("🏢 Stock Analysis Platform v2.0")
     print("=" * 60)
     
-    if args.command == 'fetch':
-        success = fetch_data(args.ticker, args.period, args.interval)
-        if success:
-            print(f"\n💡 提示: 现在可以运行分析命令:")
-            print(f"   python3 main.py analyze {args.ticker}")
-    
-    elif args.command == 'analyze':
-        success = analyze_returns(args.ticker)
-        if not success:
-            print(f"\n💡 提示: 可能需要先获取数据:")
-            print(f"   python3 main.py fetch {args.ticker}")
-    
-    elif args.command == 'intraday':
-        success = analyze_intraday_returns(args.ticker)
-        if not success:
-            print(f"\n💡 提示: 可能需要先获取数据:")
-            print(f"   python3 main.py fetch {args.ticker}")
-    
-    elif args.command == 'range':
-        success = analyze_daily_range(args.ticker)
-        if not success:
-            print(f"\n💡 提示: 可能需要先获取数据:")
-            print(f"   python3 main.py fetch {args.ticker}")
-    
-    elif args.command == 'compare':
-        success = compare_stocks(args.tickers)
-        if not success:
-            print(f"\n💡 提示: 可能需要先获取数据:")
-            for ticker in args.tickers:
-                print(f"   python3 main.py fetch {ticker}")
-    
-    elif args.command == 'list':
-        show_available_data()
+    # 各子命令通过set_defaults绑定处理函数
+    args.func(args)
     
     print("\n" + "=" * 60)
     print("✅ 操作完成")
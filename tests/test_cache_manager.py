@@ -0,0 +1,54 @@
+"""
+Tests for CacheManager.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data_fetching.cache_manager import CacheManager
+
+
+def _bars(start, end, volume=1000):
+    index = pd.bdate_range(start, end)
+    close = np.linspace(100.0, 200.0, len(index))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': np.full(len(index), volume)}, index=index)
+
+
+class CacheManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(os.path.join(self.tmpdir.name, 'stock_cache.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_get_cached_data_many_releases_worker_readers(self):
+        self.cache.cache_data('AAPL', '1d', _bars('2024-01-01', '2024-06-28'))
+        requests = [('AAPL', '1d', date(2024, 1, 1), date(2024, 6, 28))] * 4
+
+        for _ in range(3):
+            results = self.cache.get_cached_data_many(requests, max_workers=4)
+            self.assertTrue(all(df is not None and len(df) == 130 for df in results.values()))
+
+        self.assertEqual(self.cache._readers, {})
+
+    def test_fractional_volumes_are_truncated(self):
+        df = _bars('2024-01-01', '2024-01-05', volume=1234.7)
+        df.iloc[1, df.columns.get_loc('Volume')] = np.nan
+
+        self.cache.cache_data('AAPL', '1d', df)
+        cached = self.cache.get_cached_data('AAPL', '1d', date(2024, 1, 1), date(2024, 1, 5))
+
+        self.assertEqual(cached['Volume'].fillna(-1).tolist(), [1234, -1, 1234, 1234, 1234])
+
+
+if __name__ == '__main__':
+    unittest.main()
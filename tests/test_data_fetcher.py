@@ -0,0 +1,70 @@
+"""
+Tests for StockDataService cache coverage.
+
+The Yahoo Finance API is mocked, so these run offline.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data_fetching import data_fetcher
+from data_fetching.data_fetcher import StockDataService
+
+
+class _FixedDate(date):
+    """date whose today() is pinned to 2026-10-15 (ten years earlier is a Saturday)."""
+
+    @classmethod
+    def today(cls):
+        return cls(2026, 10, 15)
+
+
+def _history(period=None, interval='1d', start=None, **kwargs):
+    """Business-day bars for the last ten years, as Yahoo returns them."""
+    index = pd.bdate_range(start or '2016-10-15', '2026-10-15', tz='America/New_York')
+    close = np.linspace(100.0, 200.0, len(index))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': np.full(len(index), 1000)}, index=index)
+
+
+class CacheCoverageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'stock_cache.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _fetch_twice(self, **service_kwargs):
+        with mock.patch.object(data_fetcher, 'date', _FixedDate), \
+             mock.patch('yfinance.Ticker') as ticker:
+            ticker.return_value.history.side_effect = _history
+            for _ in range(2):
+                service = StockDataService(self.db_path, **service_kwargs)
+                data = service.get_stock_data('AAPL', period='10y')
+                service.cache_manager.close()
+            return ticker.return_value.history.call_count, data
+
+    def test_weekend_period_start_is_served_from_cache(self):
+        self.assertEqual(date(2016, 10, 15).weekday(), 5)
+
+        calls, data = self._fetch_twice()
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(data.index[0], pd.Timestamp('2016-10-17'))
+
+    def test_weekend_period_start_without_ttl(self):
+        calls, _ = self._fetch_twice(cache_ttl=None)
+
+        self.assertEqual(calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
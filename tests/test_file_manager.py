@@ -0,0 +1,62 @@
+"""
+Tests for FileManager result serialization.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from data_analysis.modules import file_manager
+from data_analysis.modules.file_manager import FileManager
+
+
+class SaveAnalysisResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def _save_and_load(self, results):
+        filename = FileManager().save_analysis_results(results, 'test')
+        with open(filename, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _assert_field_types(self):
+        base = {'n': np.int64(5), 'mean': np.float64(0.25), 'values': np.array([1.0, 2.0]),
+                'start': pd.Timestamp('2024-01-02'), 'percentiles': {5: np.float64(-1.5)}}
+
+        for extra in ({}, {'skewness': float('nan'), 'max': np.float64('inf')}):
+            with self.subTest(non_finite=bool(extra)):
+                saved = self._save_and_load({**base, **extra})
+
+                self.assertEqual(saved['n'], 5)
+                self.assertIsInstance(saved['n'], int)
+                self.assertEqual(saved['mean'], 0.25)
+                self.assertEqual(saved['values'], [1.0, 2.0])
+                self.assertEqual(saved['start'], '2024-01-02 00:00:00')
+                self.assertEqual(saved['percentiles'], {'5': -1.5})
+                for key in extra:
+                    self.assertIsNone(saved[key])
+
+    def test_field_types_with_orjson(self):
+        if file_manager.orjson is None:
+            self.skipTest('orjson is not installed')
+        self._assert_field_types()
+
+    def test_field_types_with_stdlib_json(self):
+        with mock.patch.object(file_manager, 'orjson', None):
+            self._assert_field_types()
+
+
+if __name__ == '__main__':
+    unittest.main()
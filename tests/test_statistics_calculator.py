@@ -0,0 +1,38 @@
+"""
+Tests for StatisticsCalculator basic statistics.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_analysis.modules.statistics_calculator import StatisticsCalculator
+
+
+class BasicStatsTest(unittest.TestCase):
+
+    def assertMatchesPandas(self, stats, series):
+        np.testing.assert_allclose(stats['skewness'], series.skew(), atol=1e-12)
+        np.testing.assert_allclose(stats['kurtosis'], series.kurt(), atol=1e-12)
+
+    def test_constant_columns_match_pandas(self):
+        for value, n in [(0.1, 3), (0.1, 39), (0.37, 81), (-0.0123, 250)]:
+            with self.subTest(value=value, n=n):
+                series = pd.Series([value] * n)
+                self.assertMatchesPandas(StatisticsCalculator.calculate_basic_stats(series), series)
+
+    def test_batch_constant_columns_have_zero_moments(self):
+        rng = np.random.default_rng(0)
+        columns = {'const_a': pd.Series([0.1] * 39), 'const_b': pd.Series([0.37] * 39),
+                   'random': pd.Series(rng.normal(size=39))}
+
+        results = StatisticsCalculator.calculate_basic_stats_batch(columns)
+
+        for name in ('const_a', 'const_b'):
+            self.assertEqual((results[name]['skewness'], results[name]['kurtosis']), (0.0, 0.0))
+        self.assertMatchesPandas(results['random'], columns['random'])
+
+
+if __name__ == '__main__':
+    unittest.main()